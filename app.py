@@ -1,37 +1,155 @@
 import os
+import re
 import json
+import orjson
+import hashlib
+import mmap
+import base64
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
 import requests
-from flask import Flask, request, jsonify, Response
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from flask import Flask, request, jsonify, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
+from werkzeug.exceptions import RequestEntityTooLarge
 import googlemaps
-import openai
+from openai import OpenAI
+import httpx
+import tiktoken
 from dotenv import load_dotenv
 from geopy.distance import geodesic
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from collections import Counter, OrderedDict
+from itertools import groupby
+from urllib.parse import quote
+from functools import lru_cache
 import time
+import shutil
+import struct
 import tempfile
 import threading
 
 load_dotenv()
 
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, honouring sort_keys and indent"""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get("default", self.default), option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
+# Compress JSON responses (base64 audio, search results) for clients that accept it
+app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+app.config["COMPRESS_MIN_SIZE"] = 1024
+app.config["COMPRESS_LEVEL"] = 5
+Compress(app)
+
+# Largest accepted upload request; 25MB of audio (ElevenLabs' limit, also enforced
+# by assess_speech_clarity) plus headroom for the multipart envelope and form fields
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024 + 64 * 1024
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES
+
+@app.before_request
+def reject_oversized_upload():
+    """Refuse an oversized upload from its headers, before the body is parsed or saved.
+    Flask only enforces MAX_CONTENT_LENGTH when a view reads the body, and the views'
+    catch-all handlers would turn that error into a 500"""
+    if request.content_length and request.content_length > MAX_UPLOAD_BYTES:
+        raise RequestEntityTooLarge()
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(error):
+    return jsonify({"error": "Audio file too large (max 25MB)"}), 413
+
+# Logging: request threads only enqueue records, a background listener thread
+# formats them and writes to stderr. LOG_LEVEL=DEBUG enables the per-step detail
+app_logger = logging.getLogger("cereflow")
+app_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+app_logger.propagate = False
+log_queue = queue.Queue(-1)
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+log_listener = QueueListener(log_queue, log_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+app_logger.addHandler(QueueHandler(log_queue))
+search_logger = logging.getLogger("cereflow.search")
+logger = logging.getLogger("cereflow.stroke")
+
 # API Keys
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 
-print(f"Google Maps API Key: {'Found' if GOOGLE_MAPS_API_KEY else 'Missing'}")
-print(f"OpenAI API Key: {'Found' if OPENAI_API_KEY else 'Missing'}")
-print(f"ElevenLabs API Key: {'Found' if ELEVENLABS_API_KEY else 'Missing'}")
+app_logger.info("Google Maps API Key: %s", 'Found' if GOOGLE_MAPS_API_KEY else 'Missing')
+app_logger.info("OpenAI API Key: %s", 'Found' if OPENAI_API_KEY else 'Missing')
+app_logger.info("ElevenLabs API Key: %s", 'Found' if ELEVENLABS_API_KEY else 'Missing')
+
+# Keep-alive pool shared by the Google Maps client and the Places API calls,
+# so searches reuse TLS connections instead of handshaking on every request
+google_session = requests.Session()
+google_session.mount("https://", HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.2, raise_on_status=False)
+))
+
+gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY, requests_session=google_session)
 
-gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
-openai.api_key = OPENAI_API_KEY
+# One OpenAI client shared by all request threads: its httpx pool keeps TLS
+# connections warm, and the SDK retries transient failures with backoff
+openai_client = OpenAI(
+    api_key=OPENAI_API_KEY,
+    max_retries=2,
+    timeout=httpx.Timeout(60.0, connect=3.0)
+)
 
 # Thread pool for concurrent operations
 executor = ThreadPoolExecutor(max_workers=10)
 
+# Upper bound on in-flight OpenAI/ElevenLabs calls from the speech pipeline,
+# so overlapping stages cannot pile up more upstream requests than this
+UPSTREAM_CONCURRENCY = int(os.getenv("UPSTREAM_CONCURRENCY", "8"))
+
+# Keep-alive connections held open to ElevenLabs; bursts beyond this wait for a
+# pooled connection instead of opening throwaway sockets
+ELEVENLABS_POOL_SIZE = int(os.getenv("ELEVENLABS_POOL_SIZE", "16"))
+
+# Seconds a successful GET /voices response is reused; the list changes rarely
+# and is invalidated whenever this app clones or deletes a voice
+VOICES_CACHE_TTL = 30
+
+# Chat completion replies keyed on a hash of the full request (model, messages,
+# temperature, max_tokens); the same facilities come back across searches
+AI_CACHE_TTL = 7 * 86400
+AI_CACHE_SIZE = 2048
+ai_cache = OrderedDict()
+ai_cache_lock = threading.Lock()
+
+# Places text-search results keyed on (query, lat, lng) with the coordinates
+# rounded to 2 decimals (~1 km), so nearby searches for the same city share them
+PLACES_CACHE_TTL = 24 * 3600
+PLACES_CACHE_SIZE = 1024
+places_cache = OrderedDict()
+places_cache_lock = threading.Lock()
+
 # =============================================================================
 # HEALTH CHECK
 # =============================================================================
@@ -55,6 +173,46 @@ def health():
 # SEARCH FUNCTIONALITY - REAL DATA, NO MOCKS
 # =============================================================================
 
+@lru_cache(maxsize=4096)
+def _geocode_cached(normalized_location):
+    """Geocode a normalized location string once; returns (lat, lng) or None if not found"""
+    geocode_result = gmaps.geocode(normalized_location)
+    if not geocode_result:
+        return None
+    coordinates = geocode_result[0]['geometry']['location']
+    return coordinates['lat'], coordinates['lng']
+
+def geocode_location(location):
+    """Geocode a location, reusing earlier results for the same place name"""
+    return _geocode_cached(" ".join(location.lower().split()))
+
+def cached_chat_completion(model, messages, max_tokens, temperature, response_format=None):
+    """Return the reply text for a chat completion, reusing the reply to an identical earlier request"""
+    key = hashlib.sha256(json.dumps([model, messages, temperature, max_tokens, response_format], sort_keys=True).encode()).hexdigest()
+    now = time.monotonic()
+    with ai_cache_lock:
+        cached = ai_cache.get(key)
+        if cached is not None and now - cached[0] < AI_CACHE_TTL:
+            ai_cache.move_to_end(key)
+            return cached[1]
+    
+    extra = {"response_format": response_format} if response_format else {}
+    response = openai_client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        **extra
+    )
+    content = response.choices[0].message.content
+    
+    with ai_cache_lock:
+        ai_cache[key] = (now, content)
+        ai_cache.move_to_end(key)
+        if len(ai_cache) > AI_CACHE_SIZE:
+            ai_cache.popitem(last=False)
+    return content
+
 def get_search_terms(service):
     """Get appropriate search terms based on service type"""
     if service == 'emergency':
@@ -89,6 +247,15 @@ def search_places_threaded(query, lat, lng):
         'X-Goog-Api-Key': GOOGLE_MAPS_API_KEY,
         'X-Goog-FieldMask': 'places.displayName,places.formattedAddress,places.location,places.rating,places.userRatingCount,places.types,places.id,places.nationalPhoneNumber,places.websiteUri'
     }
+    lat, lng = round(lat, 2), round(lng, 2)
+    key = (query, lat, lng)
+    now = time.monotonic()
+    with places_cache_lock:
+        cached = places_cache.get(key)
+        if cached is not None and now - cached[0] < PLACES_CACHE_TTL:
+            places_cache.move_to_end(key)
+            return cached[1]
+    
     payload = {
         'textQuery': query,
         'locationBias': {
@@ -101,17 +268,22 @@ def search_places_threaded(query, lat, lng):
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=8)
-        print(f"API Response Status for '{query}': {response.status_code}")
+        response = google_session.post(url, headers=headers, json=payload, timeout=8)
+        search_logger.debug("API Response Status for '%s': %s", query, response.status_code)
         if response.status_code != 200:
-            print(f"API Response Error for '{query}': {response.text}")
+            search_logger.warning("API Response Error for '%s': %s", query, response.text)
             return []
         result = response.json()
         places = result.get('places', [])
-        print(f"Found {len(places)} results for '{query}'")
+        search_logger.debug("Found %s results for '%s'", len(places), query)
+        with places_cache_lock:
+            places_cache[key] = (now, places)
+            places_cache.move_to_end(key)
+            if len(places_cache) > PLACES_CACHE_SIZE:
+                places_cache.popitem(last=False)
         return places
     except Exception as e:
-        print(f"Places API error for '{query}': {e}")
+        search_logger.warning("Places API error for '%s': %s", query, e)
         return []
 
 def get_all_places_concurrent(search_terms, lat, lng):
@@ -131,7 +303,7 @@ def get_all_places_concurrent(search_terms, lat, lng):
             places = future.result()
             all_places.extend(places)
         except Exception as e:
-            print(f"Error searching for '{term}': {e}")
+            search_logger.warning("Error searching for '%s': %s", term, e)
     
     return all_places
 
@@ -152,38 +324,39 @@ def batch_analyze_with_ai(places_batch, service):
 
 {batch_text}
 
-Respond with JSON array: [{{"index": 1, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, {{"index": 2, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, ...]"""
+Respond with JSON object: {{"results": [{{"index": 1, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, {{"index": 2, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, ...]}}"""
         elif service == 'rehab_therapy':
             ai_prompt = f"""Analyze these facilities for stroke rehabilitation therapy suitability (physical therapy, speech therapy, occupational therapy). For each facility, determine if it's medical and rate 0-100:
 
 {batch_text}
 
-Respond with JSON array: [{{"index": 1, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, {{"index": 2, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, ...]"""
+Respond with JSON object: {{"results": [{{"index": 1, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, {{"index": 2, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, ...]}}"""
         elif service == 'support_groups':
             ai_prompt = f"""Analyze these facilities for stroke support groups or mental health support suitability. For each facility, determine if it's medical and rate 0-100:
 
 {batch_text}
 
-Respond with JSON array: [{{"index": 1, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, {{"index": 2, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, ...]"""
+Respond with JSON object: {{"results": [{{"index": 1, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, {{"index": 2, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, ...]}}"""
         else:
             ai_prompt = f"""Analyze these medical facilities for {service} suitability. For each facility, determine if it's medical and rate 0-100:
 
 {batch_text}
 
-Respond with JSON array: [{{"index": 1, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, {{"index": 2, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, ...]"""
+Respond with JSON object: {{"results": [{{"index": 1, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, {{"index": 2, "is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}, ...]}}"""
         
         # REAL OpenAI API call
-        ai_response = openai.ChatCompletion.create(
+        ai_response = cached_chat_completion(
             model="gpt-3.5-turbo",
             messages=[
-                {"role": "system", "content": "Analyze facilities and respond only with valid JSON array. Be consistent with the original individual analysis criteria."},
+                {"role": "system", "content": "Analyze facilities and respond only with a valid JSON object. Be consistent with the original individual analysis criteria."},
                 {"role": "user", "content": ai_prompt}
             ],
             max_tokens=800,
-            temperature=0.1
+            temperature=0.1,
+            response_format={"type": "json_object"}
         )
         
-        results_array = json.loads(ai_response.choices[0].message.content.strip())
+        results_array = json.loads(ai_response)['results']
         
         # Convert to dictionary for easy lookup
         results_dict = {}
@@ -195,7 +368,7 @@ Respond with JSON array: [{{"index": 1, "is_medical": true/false, "score": 0-100
         return results_dict
         
     except Exception as e:
-        print(f"Batch AI error: {e}")
+        search_logger.error("Batch AI error: %s", e)
         return {i: {"is_medical": False, "score": 0, "reason": "Analysis failed"} 
                 for i in range(len(places_batch))}
 
@@ -207,39 +380,40 @@ def search():
     location = data.get('location')
     service = data.get('service', 'emergency')
     
-    print(f"Search: {location}, {service}")
+    search_logger.info("Search: %s, %s", location, service)
     
     try:
         # REAL Geocoding with Google Maps
-        geocode_result = gmaps.geocode(location)
-        if not geocode_result:
+        coordinates = geocode_location(location)
+        if not coordinates:
             return jsonify({"error": "Location not found"}), 400
             
-        lat = geocode_result[0]['geometry']['location']['lat']
-        lng = geocode_result[0]['geometry']['location']['lng']
-        print(f"Geocoded to: {lat}, {lng}")
+        lat, lng = coordinates
+        search_logger.debug("Geocoded to: %s, %s", lat, lng)
         
         # Get service-specific search terms
         search_terms = get_search_terms(service)
-        print(f"Search terms for {service}: {search_terms}")
+        search_logger.debug("Search terms for %s: %s", service, search_terms)
         
         # REAL concurrent places search
         places_start = time.time()
         all_places = get_all_places_concurrent(search_terms, lat, lng)
         places_time = time.time() - places_start
-        print(f"Concurrent places search took: {places_time:.2f}s")
+        search_logger.info("Concurrent places search took: %.2fs", places_time)
         
         # Remove duplicates
-        unique_places = {}
+        seen_ids = set()
+        unique_places = []
         for place in all_places:
             place_id = place.get('id')
-            if place_id and place_id not in unique_places:
-                unique_places[place_id] = place
+            if place_id and place_id not in seen_ids:
+                seen_ids.add(place_id)
+                unique_places.append(place)
         
-        print(f"Total unique places: {len(unique_places)}")
+        search_logger.info("Total unique places: %s", len(unique_places))
         
         # Process places with REAL AI analysis
-        places_list = list(unique_places.values())[:15]
+        places_list = unique_places[:15]
         
         # Prepare data for batch AI analysis
         ai_start = time.time()
@@ -255,7 +429,7 @@ def search():
         # REAL AI analysis
         ai_results = batch_analyze_with_ai(places_for_ai, service)
         ai_time = time.time() - ai_start
-        print(f"Batch AI analysis took: {ai_time:.2f}s")
+        search_logger.info("Batch AI analysis took: %.2fs", ai_time)
         
         # Process results
         results = []
@@ -268,7 +442,7 @@ def search():
                 ai_result = ai_results.get(i, {"is_medical": False, "score": 0, "reason": "Analysis failed"})
                 
                 if not ai_result.get('is_medical', False):
-                    print(f"AI rejected: {name}")
+                    search_logger.debug("AI rejected: %s", name)
                     continue
                 
                 # REAL distance calculation
@@ -322,17 +496,17 @@ def search():
                     "service_type": service
                 }
                 results.append(result)
-                print(f"Added: {name} (Score: {score})")
+                search_logger.debug("Added: %s (Score: %s)", name, score)
                 
             except Exception as e:
-                print(f"Error processing: {e}")
+                search_logger.warning("Error processing: %s", e)
                 continue
         
         # Sort by relevance score
         results.sort(key=lambda x: x['relevance_score'], reverse=True)
         
         total_time = time.time() - start_time
-        print(f"TOTAL REQUEST TIME: {total_time:.2f}s")
+        search_logger.info("TOTAL REQUEST TIME: %.2fs", total_time)
         
         return jsonify({
             "results": results,
@@ -351,14 +525,191 @@ def search():
         })
         
     except Exception as e:
-        print(f"Search error: {e}")
+        search_logger.error("Search error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 # =============================================================================
 # STROKE-OPTIMIZED SPEECH FUNCTIONALITY WITH ENHANCED VOICE CLONING
 # =============================================================================
 
+# Script patterns checked in order by detect_language (compiled once at import)
+_LANG_PATTERNS = (
+    (re.compile(r'[අ-ෆ]'), "si"),  # Sinhala
+    (re.compile(r'[ग-ॿ]'), "ne"),  # Nepali (Devanagari script), disambiguated from Hindi below
+    (re.compile(r'[अ-ॿ]'), "hi"),  # Hindi/Devanagari (broader range)
+    (re.compile(r'[ก-๛]'), "th"),  # Thai
+    (re.compile(r'[ა-ჿ]'), "ka"),  # Georgian
+    (re.compile(r'[አ-ፚ]'), "am"),  # Amharic
+    (re.compile(r'[ا-ي]'), "ar"),  # Arabic
+    (re.compile(r'[一-龯]'), "zh"),  # Chinese
+    (re.compile(r'[ひらがなカタカナ]|[一-龯]'), "ja"),  # Japanese
+    (re.compile(r'[가-힣]'), "ko"),  # Korean
+    (re.compile(r'[а-я]', re.IGNORECASE), "ru"),  # Russian/Cyrillic
+    (re.compile(r'[α-ω]', re.IGNORECASE), "el"),  # Greek
+    (re.compile(r'[а-щъьюя]', re.IGNORECASE), "bg"),  # Bulgarian
+    (re.compile(r'[ć-ž]', re.IGNORECASE), "hr"),  # Croatian/Serbian
+    (re.compile(r'[à-ÿ]', re.IGNORECASE), "es"),  # French/Spanish/etc, disambiguated below
+    (re.compile(r'[a-zA-Z]'), "en"),  # English or other Latin script
+)
+_NEPALI_WORDS = ('छ', 'छु', 'छन्', 'हुन्छ', 'गर्छ', 'भन्छ', 'आउँछ')
+_HINDI_WORDS = ('है', 'हैं', 'करता', 'करते', 'होता', 'होते')
+_SPANISH_WORDS = ('que', 'de', 'la', 'el', 'en', 'es', 'para')
+_FRENCH_WORDS = ('que', 'de', 'le', 'la', 'et', 'en', 'pour')
+_ITALIAN_WORDS = ('che', 'di', 'la', 'il', 'e', 'in', 'per')
+
+# Common English words used to keep English input from being treated as another language
+_ENGLISH_WORDS = frozenset({
+    'the', 'and', 'is', 'to', 'of', 'a', 'in', 'that', 'have', 'for', 'not',
+    'with', 'he', 'as', 'you', 'do', 'at', 'this', 'but', 'his', 'by', 'from',
+    'they', 'we', 'say', 'her', 'she', 'or', 'an', 'will', 'my', 'one', 'all',
+    'would', 'there', 'their', 'what', 'so', 'up', 'out', 'if', 'about', 'who',
+    'get', 'which', 'go', 'me', 'when', 'make', 'can', 'like', 'time', 'no',
+    'just', 'him', 'know', 'take', 'people', 'into', 'year', 'your', 'good',
+    'some', 'could', 'them', 'see', 'other', 'than', 'then', 'now', 'look',
+    'only', 'come', 'its', 'over', 'think', 'also', 'back', 'after', 'use',
+    'two', 'how', 'our', 'work', 'first', 'well', 'way', 'even', 'new', 'want',
+    'because', 'any', 'these', 'give', 'day', 'most', 'us', 'hello', 'tried',
+    'called', 'speech', 'works', 'thing', 'stroke', 'fix', 'slurred',
+    'control', 'website', 'trigger'
+})
+_WORD_RE = re.compile(r"[a-z']+")
+
+# Short English phrases without hesitations are passed through without an OpenAI call
+_FAST_PATH_MAX_WORDS = 3
+_FILLERS = frozenset({'uh', 'um', 'er', 'ah', 'hmm'})
+# Triple-repeated letters or a word repeated back to back
+_STUTTER_RE = re.compile(r"(.)\1{2,}|\b(\w+)\s+\2\b", re.IGNORECASE)
+
+# Enhancement cache sizing; only the exact normalized wording reuses a result,
+# since reordered words or a dropped negation change the meaning
+_ENHANCEMENT_CACHE_SIZE = 2048
+
+# Labels the model sometimes puts in front of its answer. Each is stripped at most
+# once, in this order, so the regex is a chain of optional groups
+_RESPONSE_PREFIXES = (
+    "मूल भाषा:", "मुल भाषा:", "Original:", "Fixed:", "Corrected:", "सुधारिएको:", "सुधारा गया:", "निवारदि कळ:", 
+    "Enhanced:", "Clear:", "सुधारिएको पाठ:", "सुधारा हुआ:", "नेपाली:", "हिंदी:", "सिंहला:", 
+    "English:", "Text:", "पाठ:", "टेक्स्ट:", "Enhanced version:", "मूल भाषा", 
+    '"', "'", ":", "।", ".", "Updated:", "Result:"
+)
+_RESPONSE_PREFIX_RE = re.compile("^" + "".join(rf"(?:{re.escape(prefix)}\s*)?" for prefix in _RESPONSE_PREFIXES))
+_WRAPPING_QUOTES_RE = re.compile(r"^(['\"])(.*)\1$", re.DOTALL)
+
+# Fallback-voice cues, matched as substrings like the original keyword checks
+_OLDER_SPEAKER_RE = re.compile(r"son|daughter|grandchildren|retirement", re.IGNORECASE)
+_FEMALE_SPEAKER_RE = re.compile(r"she|her|mom|wife|sister", re.IGNORECASE)
+
+# A word said this many times in a row is a stutter ("I I I want"); a single repeat
+# is left alone, since reduplication carries meaning ("bye bye", "धीरे धीरे")
+_STUTTER_RUN_LENGTH = 3
+
+def _local_smooth(text: str) -> str:
+    """Drop filler words and stuttered runs of a word ("I I I want" -> "I want") without an API call"""
+    tokens = [token for token in text.split() if token.lower().strip(".,!?") not in _FILLERS]
+    out = []
+    for _, run in groupby(tokens, key=lambda token: token.lower().strip(".,!?")):
+        run = list(run)
+        if len(run) >= _STUTTER_RUN_LENGTH:
+            out.append(run[-1])  # Keep the last one, which carries any trailing punctuation
+        else:
+            out.extend(run)
+    return " ".join(out)
+
+def _count_english_words(text: str, limit: int) -> int:
+    """Count distinct common English words in text, stopping as soon as limit is reached"""
+    seen = set()
+    for match in _WORD_RE.finditer(text.lower()):
+        word = match.group()
+        if word in _ENGLISH_WORDS:
+            seen.add(word)
+            if len(seen) >= limit:
+                break
+    return len(seen)
+
+# Completion budget used when the tokenizer is unavailable
+_FALLBACK_MAX_TOKENS = 150
+
+@lru_cache(maxsize=1)
+def _get_token_encoder():
+    """Load the gpt-3.5-turbo tokenizer once; tiktoken fetches its BPE file on first use.
+    Returns None (cached, so the download isn't retried) when that fetch fails"""
+    try:
+        return tiktoken.encoding_for_model("gpt-3.5-turbo")
+    except Exception as e:
+        logger.warning("Tokenizer unavailable, using a fixed enhancement budget: %s", e)
+        return None
+
+def _enhancement_max_tokens(text: str) -> int:
+    """Size the completion budget from the input, since the model rewrites rather than expands it"""
+    encoder = _get_token_encoder()
+    if encoder is None:
+        return _FALLBACK_MAX_TOKENS
+    try:
+        input_tokens = len(encoder.encode(text))
+    except Exception:
+        return _FALLBACK_MAX_TOKENS
+    return min(256, max(40, int(input_tokens * 1.4)))
+
+@lru_cache(maxsize=4096)
+def _detect_language_impl(text: str) -> str:
+    """Detect language from character patterns (memoized; callers pass a bounded prefix)"""
+    for pattern, language in _LANG_PATTERNS:
+        if pattern.search(text):
+            break
+    else:
+        return "en"  # Default to English for unknown
+    
+    if language == "ne":
+        # Try to distinguish Nepali from Hindi by common words
+        if any(word in text for word in _NEPALI_WORDS):
+            return "ne"
+        elif any(word in text for word in _HINDI_WORDS):
+            return "hi"
+        else:
+            return "ne"  # Default to Nepali for mixed Devanagari
+    elif language == "es":
+        # Try to distinguish between Romance languages
+        text_lower = text.lower()
+        if any(word in text_lower for word in _SPANISH_WORDS):
+            return "es"
+        elif any(word in text_lower for word in _FRENCH_WORDS):
+            return "fr"
+        elif any(word in text_lower for word in _ITALIAN_WORDS):
+            return "it"
+        else:
+            return "es"  # Default to Spanish
+    return language
+
 class StrokeOptimizedSpeechProcessor:
+    # Primary well-supported languages
+    _WELL_SUPPORTED = frozenset({
+        "en", "es", "fr", "de", "it", "pt", "ru", "zh", "ja", "ko", 
+        "hi", "ar", "nl", "pl", "sv", "da", "no", "fi", "ne", "si"
+    })
+    
+    # Eleven v3 supports 70+ languages (highest quality but newer)
+    _V3_LANGS = frozenset({
+        "afr", "ara", "hye", "asm", "aze", "bel", "ben", "bos", "bul", "cat", 
+        "ces", "cmn", "hrv", "dan", "nld", "eng", "est", "fin", "fra", "glg",
+        "kat", "deu", "ell", "guj", "heb", "hin", "hun", "isl", "ind", "gle",
+        "ita", "jpn", "kan", "kaz", "kor", "lav", "lit", "ltz", "mkd", "msa",
+        "mal", "mlt", "mar", "nep", "nor", "ory", "fas", "pol", "por", "pan",
+        "ron", "rus", "sin", "slk", "slv", "spa", "swa", "swe", "tam", "tel",
+        "tha", "tur", "ukr", "urd", "uzb", "vie", "cym", "xho", "yid", "yor",
+        "zul", "en", "ne", "si", "hi", "ar", "zh", "ja", "ko", "th", "de", 
+        "fr", "es", "it", "pt", "ru", "pl", "nl", "sv", "da", "no", "fi"
+    })
+    
+    # Multilingual v2 languages (29+ languages, most stable)
+    _V2_LANGS = frozenset({
+        "en", "zh", "ja", "de", "hi", "fr", "ko", "pt", "it", "es", "id", 
+        "nl", "tr", "fil", "pl", "sv", "bg", "ro", "ar", "cs", "el", "fi",
+        "hr", "ms", "sk", "da", "ta", "uk", "ru", "ne", "si"
+    })
+    
+    # Flash v2.5 languages (32 languages, fastest)
+    _FLASH_LANGS = _V2_LANGS | frozenset({"additional_flash_langs"})  # Flash has all v2 + more
+    
     def __init__(self):
         self.elevenlabs_base_url = "https://api.elevenlabs.io/v1"
         # Voice IDs for fallback voices that sound natural for different demographics
@@ -369,6 +720,21 @@ class StrokeOptimizedSpeechProcessor:
             "young_female": "pNInz6obpgDQGcFmaJgB"     # Younger female voice
         }
         self.detected_language = "en"  # Default language
+        # LRU of normalized text -> enhanced text to skip repeat OpenAI calls
+        self._enhancement_cache = OrderedDict()
+        self._enhancement_cache_lock = threading.Lock()
+        self._upstream_slots = threading.BoundedSemaphore(UPSTREAM_CONCURRENCY)
+        # (fetched_at, response) for the last successful GET /voices
+        self._voices_cache = None
+        # Pooled keep-alive session so ElevenLabs calls reuse TCP/TLS connections
+        self.session = requests.Session()
+        self.session.headers.update({"xi-api-key": ELEVENLABS_API_KEY})
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=ELEVENLABS_POOL_SIZE,
+            pool_block=True,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
+        ))
         self._warmup()
         
     def _warmup(self):
@@ -381,7 +747,12 @@ class StrokeOptimizedSpeechProcessor:
     
     def _warmup_openai(self):
         try:
-            openai.ChatCompletion.create(
+            # Load the tokenizer here so the first enhancement doesn't pay for it
+            _get_token_encoder()
+        except Exception:
+            pass
+        try:
+            openai_client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": "Hi"}],
                 max_tokens=1
@@ -391,58 +762,39 @@ class StrokeOptimizedSpeechProcessor:
     
     def _warmup_elevenlabs(self):
         try:
-            requests.get(f"{self.elevenlabs_base_url}/voices", 
-                        headers={"xi-api-key": ELEVENLABS_API_KEY}, timeout=5)
+            # Fire concurrent pings so several pooled connections finish DNS + TLS
+            # before the first real requests, not just a single socket
+            warm_connections = 4
+            with ThreadPoolExecutor(max_workers=warm_connections) as warmup_pool:
+                list(warmup_pool.map(
+                    lambda _: self.session.get(f"{self.elevenlabs_base_url}/voices", timeout=5),
+                    range(warm_connections)
+                ))
         except:
             pass
     
-    def is_language_well_supported(self, language_code):
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def is_language_well_supported(language_code):
         """Check if language is well supported by ElevenLabs"""
-        # Primary well-supported languages
-        well_supported = {
-            "en", "es", "fr", "de", "it", "pt", "ru", "zh", "ja", "ko", 
-            "hi", "ar", "nl", "pl", "sv", "da", "no", "fi", "ne", "si"
-        }
-        return language_code in well_supported
+        return language_code in StrokeOptimizedSpeechProcessor._WELL_SUPPORTED
     
-    def get_best_model_for_language(self, language_code):
-        """Select the best ElevenLabs model based on language support"""
-        
-        # Eleven v3 supports 70+ languages (highest quality but newer)
-        v3_languages = {
-            "afr", "ara", "hye", "asm", "aze", "bel", "ben", "bos", "bul", "cat", 
-            "ces", "cmn", "hrv", "dan", "nld", "eng", "est", "fin", "fra", "glg",
-            "kat", "deu", "ell", "guj", "heb", "hin", "hun", "isl", "ind", "gle",
-            "ita", "jpn", "kan", "kaz", "kor", "lav", "lit", "ltz", "mkd", "msa",
-            "mal", "mlt", "mar", "nep", "nor", "ory", "fas", "pol", "por", "pan",
-            "ron", "rus", "sin", "slk", "slv", "spa", "swa", "swe", "tam", "tel",
-            "tha", "tur", "ukr", "urd", "uzb", "vie", "cym", "xho", "yid", "yor",
-            "zul", "en", "ne", "si", "hi", "ar", "zh", "ja", "ko", "th", "de", 
-            "fr", "es", "it", "pt", "ru", "pl", "nl", "sv", "da", "no", "fi"
-        }
-        
-        # Multilingual v2 languages (29+ languages, most stable)
-        v2_languages = {
-            "en", "zh", "ja", "de", "hi", "fr", "ko", "pt", "it", "es", "id", 
-            "nl", "tr", "fil", "pl", "sv", "bg", "ro", "ar", "cs", "el", "fi",
-            "hr", "ms", "sk", "da", "ta", "uk", "ru", "ne", "si"
-        }
-        
-        # Flash v2.5 languages (32 languages, fastest)
-        flash_languages = v2_languages.union({"additional_flash_langs"})  # Flash has all v2 + more
-        
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def get_best_model_for_language(language_code):
+        """Select the best ElevenLabs model based on language support (memoized per language)"""
         # Choose model based on language support and requirements
-        if language_code in v2_languages:
+        if language_code in StrokeOptimizedSpeechProcessor._V2_LANGS:
             # Use Multilingual v2 for best stability and quality
             return "eleven_multilingual_v2"
-        elif language_code in v3_languages:
+        elif language_code in StrokeOptimizedSpeechProcessor._V3_LANGS:
             # Use v3 for languages not in v2 (when available)
             # Note: v3 might not be available for all users yet
             return "eleven_multilingual_v2"  # Fallback to v2 for now
         else:
             # For unsupported languages, use multilingual v2 anyway
             # It might still work reasonably well
-            print(f"STROKE WARNING: Language {language_code} not explicitly supported, using multilingual v2")
+            logger.warning("Language %s not explicitly supported, using multilingual v2", language_code)
             return "eleven_multilingual_v2"
     
     def assess_speech_clarity(self, file_path):
@@ -451,7 +803,7 @@ class StrokeOptimizedSpeechProcessor:
             import wave
             
             file_size = os.path.getsize(file_path)
-            print(f"STROKE DEBUG: Audio file size: {file_size} bytes")
+            logger.debug("Audio file size: %s bytes", file_size)
             
             # Basic file size checks
             if file_size == 0:
@@ -461,37 +813,53 @@ class StrokeOptimizedSpeechProcessor:
             if file_size < 15000:  # Increased minimum for stroke patients
                 return False, "Audio too short - need at least 15-30 seconds for stroke voice cloning"
             
-            # Try to read as WAV and get duration
+            # Try to read as WAV and get duration; canonical headers are parsed directly
             try:
-                with wave.open(file_path, 'rb') as wav_file:
-                    frames = wav_file.getnframes()
-                    sample_rate = wav_file.getframerate()
-                    duration = frames / float(sample_rate)
-                    channels = wav_file.getnchannels()
-                    
-                    print(f"STROKE DEBUG: Audio duration: {duration:.2f}s, channels: {channels}, sample_rate: {sample_rate}")
-                    
-                    if duration < 10.0:  # Increased minimum for stroke patients
-                        return False, f"Audio too short ({duration:.1f}s) - stroke patients need at least 15-30 seconds for good cloning"
-                    
-                    if duration > 300:  # More than 5 minutes
-                        print(f"STROKE WARNING: Audio very long ({duration:.1f}s) - may take time to process")
-                    
-                    # Additional checks for stroke speech
-                    if sample_rate < 16000:
-                        return False, f"Sample rate too low ({sample_rate}Hz) - need at least 16kHz for clear voice cloning"
-                    
-                    return True, f"Audio quality acceptable: {duration:.1f}s at {sample_rate}Hz"
+                header = self._read_wav_header(file_path)
+                if header is None:
+                    with wave.open(file_path, 'rb') as wav_file:
+                        header = (wav_file.getnframes(), wav_file.getframerate(), wav_file.getnchannels())
+                
+                frames, sample_rate, channels = header
+                duration = frames / float(sample_rate)
+                
+                logger.debug("Audio duration: %.2fs, channels: %s, sample_rate: %s", duration, channels, sample_rate)
+                
+                if duration < 10.0:  # Increased minimum for stroke patients
+                    return False, f"Audio too short ({duration:.1f}s) - stroke patients need at least 15-30 seconds for good cloning"
+                
+                if duration > 300:  # More than 5 minutes
+                    logger.warning("Audio very long (%.1fs) - may take time to process", duration)
+                
+                # Additional checks for stroke speech
+                if sample_rate < 16000:
+                    return False, f"Sample rate too low ({sample_rate}Hz) - need at least 16kHz for clear voice cloning"
+                
+                return True, f"Audio quality acceptable: {duration:.1f}s at {sample_rate}Hz"
                     
             except wave.Error:
                 # If not a valid WAV, still might work
-                print("STROKE WARNING: Could not parse as WAV, but will attempt processing")
+                logger.warning("Could not parse as WAV, but will attempt processing")
                 return True, "Audio format unknown but will attempt cloning"
                 
         except Exception as e:
-            print(f"STROKE ERROR: Audio assessment failed: {e}")
+            logger.error("Audio assessment failed: %s", e)
             return False, f"Audio assessment failed: {e}"
     
+    def _read_wav_header(self, file_path):
+        """Return (frames, sample_rate, channels) from a canonical 44-byte PCM header, or None"""
+        with open(file_path, 'rb') as f:
+            hdr = f.read(44)
+        if len(hdr) < 44 or hdr[:4] != b'RIFF' or hdr[8:12] != b'WAVE':
+            return None
+        if hdr[12:16] != b'fmt ' or hdr[36:40] != b'data':
+            return None
+        audio_format, channels, sample_rate, _, block_align = struct.unpack('<HHIIH', hdr[20:34])
+        if audio_format != 1 or not sample_rate or not block_align:
+            return None
+        data_size = struct.unpack('<I', hdr[40:44])[0]
+        return data_size // block_align, sample_rate, channels
+    
     def is_repetitive_text(self, text):
         """Check if text contains repetitive patterns (transcription error)"""
         try:
@@ -500,17 +868,20 @@ class StrokeOptimizedSpeechProcessor:
                 return False
             
             # Check for same word repeated many times
-            word_counts = {}
-            for word in words:
-                word_counts[word] = word_counts.get(word, 0) + 1
-            
             # If any word appears more than 60% of total words, it's likely repetitive
-            max_count = max(word_counts.values()) if word_counts else 0
-            if len(words) > 5 and max_count > len(words) * 0.6:
-                return True
+            if len(words) > 5:
+                max_count = Counter(words).most_common(1)[0][1]
+                if max_count > len(words) * 0.6:
+                    return True
             
-            # Check for repetitive character patterns
-            if len(set(text.replace(' ', ''))) <= 3 and len(text) > 15:
+            # Check for repetitive character patterns, stopping once a 4th distinct character shows up
+            if len(text) > 15:
+                seen_chars = set()
+                for char in text:
+                    if char != ' ':
+                        seen_chars.add(char)
+                        if len(seen_chars) > 3:
+                            return False
                 return True
                 
             return False
@@ -521,61 +892,15 @@ class StrokeOptimizedSpeechProcessor:
     def detect_language(self, text: str) -> str:
         """Detect the language of the input text"""
         try:
-            # Simple language detection based on character patterns
-            import re
-            
-            # Check for common language patterns
-            if re.search(r'[අ-ෆ]', text):  # Sinhala
-                return "si"
-            elif re.search(r'[ग-ॿ]', text):  # Nepali (Devanagari script)
-                # Try to distinguish Nepali from Hindi by common words
-                if any(word in text for word in ['छ', 'छु', 'छन्', 'हुन्छ', 'गर्छ', 'भन्छ', 'आउँछ']):
-                    return "ne"
-                elif any(word in text for word in ['है', 'हैं', 'करता', 'करते', 'होता', 'होते']):
-                    return "hi"
-                else:
-                    return "ne"  # Default to Nepali for mixed Devanagari
-            elif re.search(r'[अ-ॿ]', text):  # Hindi/Devanagari (broader range)
-                return "hi"
-            elif re.search(r'[ก-๛]', text):  # Thai
-                return "th"
-            elif re.search(r'[ა-ჿ]', text):  # Georgian
-                return "ka"
-            elif re.search(r'[አ-ፚ]', text):  # Amharic
-                return "am"
-            elif re.search(r'[ا-ي]', text):  # Arabic
-                return "ar"
-            elif re.search(r'[一-龯]', text):  # Chinese
-                return "zh"
-            elif re.search(r'[ひらがなカタカナ]|[一-龯]', text):  # Japanese
-                return "ja"
-            elif re.search(r'[가-힣]', text):  # Korean
-                return "ko"
-            elif re.search(r'[а-я]', text, re.IGNORECASE):  # Russian/Cyrillic
-                return "ru"
-            elif re.search(r'[α-ω]', text, re.IGNORECASE):  # Greek
-                return "el"
-            elif re.search(r'[а-щъьюя]', text, re.IGNORECASE):  # Bulgarian
-                return "bg"
-            elif re.search(r'[ć-ž]', text, re.IGNORECASE):  # Croatian/Serbian
-                return "hr"
-            elif re.search(r'[à-ÿ]', text, re.IGNORECASE):  # French/Spanish/etc
-                # Try to distinguish between Romance languages
-                if any(word in text.lower() for word in ['que', 'de', 'la', 'el', 'en', 'es', 'para']):
-                    return "es"
-                elif any(word in text.lower() for word in ['que', 'de', 'le', 'la', 'et', 'en', 'pour']):
-                    return "fr"
-                elif any(word in text.lower() for word in ['che', 'di', 'la', 'il', 'e', 'in', 'per']):
-                    return "it"
-                else:
-                    return "es"  # Default to Spanish
-            elif re.search(r'[a-zA-Z]', text):  # English or other Latin script
+            # Pure-ASCII text can only be English/Latin script; skip the regex scan entirely
+            if text.isascii():
                 return "en"
-            else:
-                return "en"  # Default to English for unknown
+            
+            # Simple language detection based on character patterns, cached per text prefix
+            return _detect_language_impl(text[:256])
                 
         except Exception as e:
-            print(f"Language detection failed: {e}")
+            logger.warning("Language detection failed: %s", e)
             return "en"
 
     def enhance_text_for_stroke_patients(self, text: str) -> str:
@@ -583,7 +908,7 @@ class StrokeOptimizedSpeechProcessor:
         try:
             # Check for repetitive/garbled text first
             if self.is_repetitive_text(text):
-                print("STROKE WARNING: Detected repetitive text (transcription error), trying to extract meaningful part")
+                logger.warning("Detected repetitive text (transcription error), trying to extract meaningful part")
                 # Extract the first few unique words instead of returning the whole repetitive mess
                 words = text.split()
                 seen_words = []
@@ -594,164 +919,209 @@ class StrokeOptimizedSpeechProcessor:
                         break
                 if len(seen_words) >= 3:
                     text = " ".join(seen_words)
-                    print(f"STROKE DEBUG: Extracted meaningful text: '{text}'")
+                    logger.debug("Extracted meaningful text: '%s'", text)
                 else:
-                    print("STROKE WARNING: Too few meaningful words, returning original")
+                    logger.warning("Too few meaningful words, returning original")
                     return text
             
-            # Detect language
-            detected_language = self.detect_language(text)
-            print(f"STROKE DEBUG: Detected language: {detected_language}")
+            # Deterministic cleanup first; it can leave nothing for OpenAI to smooth
+            smoothed_text = _local_smooth(text)
+            if smoothed_text:
+                text = smoothed_text
             
-            # SAFETY CHECK: If text is clearly English, force English processing
-            english_words = ['the', 'and', 'is', 'to', 'of', 'a', 'in', 'that', 'have', 'for', 'not', 'with', 'he', 'as', 'you', 'do', 'at', 'this', 'but', 'his', 'by', 'from', 'they', 'we', 'say', 'her', 'she', 'or', 'an', 'will', 'my', 'one', 'all', 'would', 'there', 'their', 'what', 'so', 'up', 'out', 'if', 'about', 'who', 'get', 'which', 'go', 'me', 'when', 'make', 'can', 'like', 'time', 'no', 'just', 'him', 'know', 'take', 'people', 'into', 'year', 'your', 'good', 'some', 'could', 'them', 'see', 'other', 'than', 'then', 'now', 'look', 'only', 'come', 'its', 'over', 'think', 'also', 'back', 'after', 'use', 'two', 'how', 'our', 'work', 'first', 'well', 'way', 'even', 'new', 'want', 'because', 'any', 'these', 'give', 'day', 'most', 'us', 'hello', 'tried', 'called', 'speech', 'works', 'thing', 'stroke', 'fix', 'slurred', 'control', 'website', 'trigger']
+            # Nothing to smooth in a short, clean English phrase
+            if self._is_trivially_clean(text):
+                logger.debug("Short clean text, skipping enhancement: '%s'", text)
+                return text
             
-            text_lower = text.lower()
-            english_word_count = sum(1 for word in english_words if word in text_lower)
-            total_words = len(text.split())
+            # Reuse earlier results for repeated phrases
+            normalized_text = " ".join(text.lower().split())
+            cached_text = self._get_cached_enhancement(normalized_text)
+            if cached_text is not None:
+                logger.debug("Using cached enhancement for '%s'", text)
+                return cached_text
             
-            if english_word_count >= 3 or (total_words > 0 and english_word_count / total_words > 0.3):
-                detected_language = "en"
-                print(f"STROKE OVERRIDE: Text contains English words, forcing English processing")
+            enhanced_text = self._enhance_with_openai(text)
+            self._cache_enhancement(normalized_text, enhanced_text)
+            return enhanced_text
             
-            # SMOOTH SPEECH ENHANCEMENT - Remove all pauses, gaps, hesitations
-            if detected_language == "en":
-                system_prompt = "You are creating smooth, fluent, clear speech for a stroke patient. Transform slurred, hesitant speech into perfect fluent speech with NO pauses, gaps, or stutters."
-                user_prompt = f"""Transform this slurred/unclear speech from a stroke patient into smooth, fluent, crystal-clear speech. Remove ALL pauses, gaps, hesitations, and stutters. Make it flow perfectly while keeping the same meaning.
+        except Exception as e:
+            logger.error("Text enhancement failed: %s", e)
+            return text
+    
+    def _is_trivially_clean(self, text: str) -> bool:
+        """True for short English text with no fillers, trailing pauses, or stuttered letters"""
+        words = text.split()
+        if not words or len(words) > _FAST_PATH_MAX_WORDS:
+            return False
+        if "..." in text or _STUTTER_RE.search(text):
+            return False
+        if any(word.strip(".,!?").lower() in _FILLERS for word in words):
+            return False
+        return self.detect_language(text) == "en"
+    
+    def _get_cached_enhancement(self, normalized_text):
+        """Look up a previous enhancement of exactly this normalized text"""
+        with self._enhancement_cache_lock:
+            cached = self._enhancement_cache.get(normalized_text)
+            if cached is not None:
+                self._enhancement_cache.move_to_end(normalized_text)
+            return cached
+    
+    def _cache_enhancement(self, normalized_text, enhanced_text):
+        """Store an enhancement result, evicting the least recently used entry when full"""
+        with self._enhancement_cache_lock:
+            self._enhancement_cache[normalized_text] = enhanced_text
+            self._enhancement_cache.move_to_end(normalized_text)
+            if len(self._enhancement_cache) > _ENHANCEMENT_CACHE_SIZE:
+                self._enhancement_cache.popitem(last=False)
+    
+    def _enhance_with_openai(self, text: str) -> str:
+        """Smooth text with OpenAI; raises if the API call fails so failures are not cached"""
+        # Detect language
+        detected_language = self.detect_language(text)
+        logger.debug("Detected language: %s", detected_language)
+        
+        # SAFETY CHECK: If text is clearly English, force English processing
+        english_word_count = _count_english_words(text, 3)
+        total_words = len(text.split())
+        
+        if english_word_count >= 3 or (total_words > 0 and english_word_count / total_words > 0.3):
+            detected_language = "en"
+            logger.info("Text contains English words, forcing English processing")
+        
+        # SMOOTH SPEECH ENHANCEMENT - Remove all pauses, gaps, hesitations
+        if detected_language == "en":
+            system_prompt = "You are creating smooth, fluent, clear speech for a stroke patient. Transform slurred, hesitant speech into perfect fluent speech with NO pauses, gaps, or stutters."
+            user_prompt = f"""Transform this slurred/unclear speech from a stroke patient into smooth, fluent, crystal-clear speech. Remove ALL pauses, gaps, hesitations, and stutters. Make it flow perfectly while keeping the same meaning.
 
 Slurred input: {text}
 
 Smooth fluent speech:"""
-                
-            elif detected_language == "ne":
-                system_prompt = "तपाईं स्ट्रोकका बिरामीको अस्पष्ट बोलीलाई चिल्लो र स्पष्ट बनाउँदै हुनुहुन्छ। सबै रोकावट र अस्पष्टता हटाउनुहोस्।"
-                user_prompt = f"""स्ट्रोक बिरामीको यो अस्पष्ट बोलीलाई एकदमै चिल्लो, स्पष्ट र प्रवाहमान बनाउनुहोस्। सबै रोकावट, अड्किनी र अस्पष्टता हटाएर पूर्ण रूपमा स्पष्ट बनाउनुहोस्।
+            
+        elif detected_language == "ne":
+            system_prompt = "तपाईं स्ट्रोकका बिरामीको अस्पष्ट बोलीलाई चिल्लो र स्पष्ट बनाउँदै हुनुहुन्छ। सबै रोकावट र अस्पष्टता हटाउनुहोस्।"
+            user_prompt = f"""स्ट्रोक बिरामीको यो अस्पष्ट बोलीलाई एकदमै चिल्लो, स्पष्ट र प्रवाहमान बनाउनुहोस्। सबै रोकावट, अड्किनी र अस्पष्टता हटाएर पूर्ण रूपमा स्पष्ट बनाउनुहोस्।
 
 अस्पष्ट बोली: {text}
 
 चिल्लो स्पष्ट बोली:"""
 
-            elif detected_language == "hi":
-                system_prompt = "आप स्ट्रोक मरीज़ की अस्पष्ट बोली को चिकनी और स्पष्ट बना रहे हैं। सभी रुकावटें और अस्पष्टता हटाएं।"
-                user_prompt = f"""स्ट्रोक मरीज़ की इस अस्पष्ट बोली को बिल्कुल चिकनी, स्पष्ट और प्रवाहमान बनाएं। सभी रुकावटें, हकलाहट और अस्पष्टता हटाकर पूरी तरह स्पष्ट बनाएं।
+        elif detected_language == "hi":
+            system_prompt = "आप स्ट्रोक मरीज़ की अस्पष्ट बोली को चिकनी और स्पष्ट बना रहे हैं। सभी रुकावटें और अस्पष्टता हटाएं।"
+            user_prompt = f"""स्ट्रोक मरीज़ की इस अस्पष्ट बोली को बिल्कुल चिकनी, स्पष्ट और प्रवाहमान बनाएं। सभी रुकावटें, हकलाहट और अस्पष्टता हटाकर पूरी तरह स्पष्ट बनाएं।
 
 अस्पष्ट बोली: {text}
 
 चिकनी स्पष्ट बोली:"""
 
-            elif detected_language == "si":
-                system_prompt = "ඔබ ආඝාත රෝගියෙකුගේ අපැහැදිලි කථනය පැහැදිලි හා සුමට බවට පත් කරයි. සියලු බාධක සහ අපැහැදිලිකම් ඉවත් කරන්න."
-                user_prompt = f"""ආඝාත රෝගියෙකුගේ මෙම අපැහැදිලි කථනය සම්පූර්ණයෙන්ම සුමට, පැහැදිලි සහ ගලා යන ලෙස කරන්න. සියලු බාධක, පැකිළීම් සහ අපැහැදිලිකම් ඉවත් කරන්න.
+        elif detected_language == "si":
+            system_prompt = "ඔබ ආඝාත රෝගියෙකුගේ අපැහැදිලි කථනය පැහැදිලි හා සුමට බවට පත් කරයි. සියලු බාධක සහ අපැහැදිලිකම් ඉවත් කරන්න."
+            user_prompt = f"""ආඝාත රෝගියෙකුගේ මෙම අපැහැදිලි කථනය සම්පූර්ණයෙන්ම සුමට, පැහැදිලි සහ ගලා යන ලෙස කරන්න. සියලු බාධක, පැකිළීම් සහ අපැහැදිලිකම් ඉවත් කරන්න.
 
 අපැහැදිලි කථනය: {text}
 
 සුමට පැහැදිලි කථනය:"""
 
-            else:
-                # Smooth speech for other/mixed languages
-                system_prompt = "Transform unclear, hesitant speech into smooth, fluent, crystal-clear speech. Remove all pauses, gaps, and stutters while keeping the same language and meaning."
-                user_prompt = f"""Transform this unclear speech into perfectly smooth, fluent speech. Remove ALL pauses, gaps, hesitations, and stutters. Make it flow perfectly while keeping the original language and meaning.
+        else:
+            # Smooth speech for other/mixed languages
+            system_prompt = "Transform unclear, hesitant speech into smooth, fluent, crystal-clear speech. Remove all pauses, gaps, and stutters while keeping the same language and meaning."
+            user_prompt = f"""Transform this unclear speech into perfectly smooth, fluent speech. Remove ALL pauses, gaps, hesitations, and stutters. Make it flow perfectly while keeping the original language and meaning.
 
 Unclear speech: {text}
 
 Smooth fluent speech:"""
-            
-            # Make the API call
-            response = openai.ChatCompletion.create(
+        
+        # Make the API call
+        with self._upstream_slots:
+            response = openai_client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
-                max_tokens=150,
+                max_tokens=_enhancement_max_tokens(text),
                 temperature=0.0,  # Zero temperature for consistency
                 top_p=1,
                 frequency_penalty=0,
                 presence_penalty=0
             )
-            
-            enhanced_text = response.choices[0].message.content.strip()
-            
-            # Clean up response - remove quotes and unwanted prefixes
-            prefixes_to_remove = [
-                "मूल भाषा:", "मुल भाषा:", "Original:", "Fixed:", "Corrected:", "सुधारिएको:", "सुधारा गया:", "निवारदि कळ:", 
-                "Enhanced:", "Clear:", "सुधारिएको पाठ:", "सुधारा हुआ:", "नेपाली:", "हिंदी:", "सिंहला:", 
-                "English:", "Text:", "पाठ:", "टेक्स्ट:", "Enhanced version:", "मूल भाषा", 
-                '"', "'", ":", "।", ".", "Updated:", "Result:"
-            ]
-            
-            for prefix in prefixes_to_remove:
-                if enhanced_text.startswith(prefix):
-                    enhanced_text = enhanced_text[len(prefix):].strip()
-            
-            # Remove quotes if they wrap the whole text
-            if (enhanced_text.startswith('"') and enhanced_text.endswith('"')) or (enhanced_text.startswith("'") and enhanced_text.endswith("'")):
-                enhanced_text = enhanced_text[1:-1].strip()
-            
-            # Final validation - reject if too different or translated
-            if detected_language == "en":
-                english_response_count = sum(1 for word in english_words if word.lower() in enhanced_text.lower())
-                if english_response_count < 2 and len(enhanced_text.split()) > 3:
-                    print(f"STROKE ERROR: AI may have translated English, returning original")
-                    return text
-            
-            # Check for dramatic length changes (translation indicator)
-            if len(enhanced_text) > len(text) * 1.8 or len(enhanced_text) < len(text) * 0.5:
-                print(f"STROKE WARNING: Length change too dramatic, returning original")
-                return text
-            
-            # If empty or just punctuation, return original
-            if len(enhanced_text.strip()) < 3:
-                print(f"STROKE WARNING: Enhancement too short, returning original")
+        
+        enhanced_text = response.choices[0].message.content.strip()
+        
+        # Clean up response - remove quotes and unwanted prefixes
+        enhanced_text = _RESPONSE_PREFIX_RE.sub("", enhanced_text, count=1).strip()
+        
+        # Remove quotes if they wrap the whole text
+        quoted = _WRAPPING_QUOTES_RE.match(enhanced_text)
+        if quoted:
+            enhanced_text = quoted.group(2).strip()
+        
+        # Final validation - reject if too different or translated
+        if detected_language == "en":
+            english_response_count = _count_english_words(enhanced_text, 2)
+            if english_response_count < 2 and len(enhanced_text.split()) > 3:
+                logger.error("AI may have translated English, returning original")
                 return text
-                
-            print(f"STROKE SUCCESS ({detected_language}): '{text}' → '{enhanced_text}'")
-            return enhanced_text
-            
-        except Exception as e:
-            print(f"STROKE ERROR: Text enhancement failed: {str(e)}")
+        
+        # Check for dramatic length changes (translation indicator)
+        if len(enhanced_text) > len(text) * 1.8 or len(enhanced_text) < len(text) * 0.5:
+            logger.warning("Length change too dramatic, returning original")
+            return text
+        
+        # If empty or just punctuation, return original
+        if len(enhanced_text.strip()) < 3:
+            logger.warning("Enhancement too short, returning original")
             return text
+            
+        logger.info("Enhanced (%s): '%s' → '%s'", detected_language, text, enhanced_text)
+        return enhanced_text
     
     def clone_voice_with_enhancement(self, name: str, audio_file_path: str) -> str:
         """Enhanced voice cloning specifically optimized for stroke patients"""
         try:
-            print(f"STROKE DEBUG: Starting enhanced voice clone for '{name}'")
-            print(f"STROKE DEBUG: File path: {audio_file_path}")
+            logger.debug("Starting enhanced voice clone for '%s'", name)
+            logger.debug("File path: %s", audio_file_path)
             
             url = f"{self.elevenlabs_base_url}/voices/add"
-            headers = {"xi-api-key": ELEVENLABS_API_KEY}
             
-            # Prepare the request with stroke-specific enhancements
-            with open(audio_file_path, "rb") as audio_file:
-                files = {
-                    "files": (f"{name}_stroke_voice.wav", audio_file, "audio/wav")
-                }
-                data = {
+            # Prepare the request with stroke-specific enhancements, streaming the
+            # multipart body from disk in 64 KiB reads instead of buffering it
+            with open(audio_file_path, "rb", buffering=65536) as audio_file:
+                encoder = MultipartEncoder(fields={
                     "name": f"Stroke_{name}_{int(time.time())}",  # Unique naming
                     "description": f"Stroke patient voice clone for {name} - enhanced for clarity",
                     # Enhanced settings for stroke speech
                     "remove_background_noise": "true",
                     "enhance_audio_quality": "true",
                     "optimize_streaming_latency": "0",  # Prioritize quality over speed
-                    "voice_settings": {
+                    "voice_settings": json.dumps({
                         "stability": 0.6,  # Higher stability for stroke speech
                         "similarity_boost": 0.9,  # Max similarity
                         "style": 0.3,  # Lower style to avoid artifacts
                         "use_speaker_boost": True
-                    }
-                }
+                    }),
+                    "files": (f"{name}_stroke_voice.wav", audio_file, "audio/wav")
+                })
                 
-                print(f"STROKE DEBUG: Sending enhanced clone request to ElevenLabs...")
-                response = requests.post(url, headers=headers, files=files, data=data, timeout=180)  # Longer timeout
+                logger.debug("Sending enhanced clone request to ElevenLabs...")
+                with self._upstream_slots:
+                    response = self.session.post(
+                        url,
+                        data=encoder,
+                        headers={"Content-Type": encoder.content_type},
+                        timeout=180  # Longer timeout
+                    )
             
-            print(f"STROKE DEBUG: Clone response status: {response.status_code}")
+            logger.debug("Clone response status: %s", response.status_code)
             
             if response.status_code == 200:
                 result = response.json()
-                print(f"STROKE DEBUG: Clone success response: {result}")
+                logger.debug("Clone success response: %s", result)
                 voice_id = result.get("voice_id")
                 if voice_id:
-                    print(f"STROKE SUCCESS: Voice cloned with ID: {voice_id}")
+                    logger.info("Voice cloned with ID: %s", voice_id)
+                    self.invalidate_voices_cache()
                     return voice_id
                 else:
                     raise Exception("No voice_id in successful response")
@@ -760,7 +1130,7 @@ Smooth fluent speech:"""
                 # For stroke patients, provide more specific guidance
                 try:
                     error_detail = response.json()
-                    print(f"STROKE DEBUG: Validation error details: {error_detail}")
+                    logger.debug("Validation error details: %s", error_detail)
                     raise Exception("Speech not clear enough for cloning - this is common with stroke speech. Try recording in a very quiet room, speak slowly and clearly, or use the practice mode first.")
                 except json.JSONDecodeError:
                     raise Exception("Audio quality insufficient for voice cloning - try recording 20-30 seconds of your clearest speech")
@@ -783,7 +1153,7 @@ Smooth fluent speech:"""
                 raise Exception("Too many voice cloning requests - please wait a moment and try again")
                 
             else:
-                print(f"STROKE DEBUG: Unexpected error response: {response.text}")
+                logger.debug("Unexpected error response: %s", response.text)
                 raise Exception(f"Voice cloning failed with error {response.status_code} - will use backup voice")
                 
         except requests.exceptions.Timeout:
@@ -791,18 +1161,16 @@ Smooth fluent speech:"""
         except requests.exceptions.ConnectionError:
             raise Exception("Cannot connect to voice cloning service - check internet connection")
         except Exception as e:
-            print(f"STROKE ERROR: Voice cloning failed: {str(e)}")
+            logger.error("Voice cloning failed: %s", e)
             raise Exception(str(e))
     
     def select_best_fallback_voice(self, original_text):
         """Select the most appropriate fallback voice based on speech patterns"""
         # Simple heuristics to choose appropriate voice
-        text_lower = original_text.lower()
-        
         # Try to detect age/gender from speech patterns (very basic)
-        if any(word in text_lower for word in ['son', 'daughter', 'grandchildren', 'retirement']):
+        if _OLDER_SPEAKER_RE.search(original_text):
             # Likely older person
-            if any(word in text_lower for word in ['she', 'her', 'mom', 'wife', 'sister']):
+            if _FEMALE_SPEAKER_RE.search(original_text):
                 return self.fallback_voices["mature_female"]
             else:
                 return self.fallback_voices["mature_male"]
@@ -813,9 +1181,10 @@ Smooth fluent speech:"""
     def transcribe_audio_fast(self, audio_file_path: str) -> str:
         """REAL OpenAI Whisper transcription optimized for stroke speech"""
         try:
-            with open(audio_file_path, "rb") as audio_file:
+            with open(audio_file_path, "rb") as audio_file, self._upstream_slots:
                 # Enhanced settings for stroke speech recognition
-                result = openai.Audio.transcribe(
+                # response_format="text" comes back as a plain string
+                text = openai_client.audio.transcriptions.create(
                     model="whisper-1",
                     file=audio_file,
                     response_format="text",
@@ -823,88 +1192,234 @@ Smooth fluent speech:"""
                     prompt="This is speech from a stroke patient that may be slurred or unclear. Please transcribe as accurately as possible."
                 )
             
-            if isinstance(result, dict):
-                return result.get("text", str(result))
-            return str(result)
+            return text.strip()
             
         except Exception as e:
             raise Exception(f"Speech recognition failed: {str(e)}")
     
+    def _tts_payload(self, text: str) -> dict:
+        """Request body shared by the buffered and streaming text-to-speech calls"""
+        # OPTIMIZED SETTINGS FOR SMOOTH, FLUENT SPEECH (no gaps or pauses)
+        return {
+            "text": text,
+            "model_id": "eleven_multilingual_v2",
+            "voice_settings": {
+                "stability": 0.85,  # Very high stability for smooth speech
+                "similarity_boost": 0.9,  # High similarity to original voice
+                "style": 0.15,  # Low style to avoid dramatic pauses
+                "use_speaker_boost": True
+            },
+            # Advanced settings for smooth output
+            "pronunciation_dictionary_locators": [],
+            "seed": None,
+            "previous_text": None,
+            "next_text": None,
+            "previous_request_ids": [],
+            "next_request_ids": [],
+            # Additional settings for fluency
+            "apply_text_normalization": "auto",
+            "optimize_streaming_latency": 0  # Prioritize quality over speed
+        }
+    
     def generate_speech_fast(self, text: str, voice_id: str = None) -> bytes:
         """REAL ElevenLabs speech generation optimized for SMOOTH, CLEAR output"""
         try:
             if not voice_id:
                 voice_id = self.fallback_voices["mature_male"]
             
-            print(f"STROKE DEBUG: Generating smooth, clear speech with voice ID: {voice_id}")
+            logger.debug("Generating smooth, clear speech with voice ID: %s", voice_id)
             
             url = f"{self.elevenlabs_base_url}/text-to-speech/{voice_id}"
             
             headers = {
                 "Accept": "audio/mpeg",
-                "Content-Type": "application/json",
-                "xi-api-key": ELEVENLABS_API_KEY
-            }
-            
-            # OPTIMIZED SETTINGS FOR SMOOTH, FLUENT SPEECH (no gaps or pauses)
-            data = {
-                "text": text,
-                "model_id": "eleven_multilingual_v2",
-                "voice_settings": {
-                    "stability": 0.85,  # Very high stability for smooth speech
-                    "similarity_boost": 0.9,  # High similarity to original voice
-                    "style": 0.15,  # Low style to avoid dramatic pauses
-                    "use_speaker_boost": True
-                },
-                # Advanced settings for smooth output
-                "pronunciation_dictionary_locators": [],
-                "seed": None,
-                "previous_text": None,
-                "next_text": None,
-                "previous_request_ids": [],
-                "next_request_ids": [],
-                # Additional settings for fluency
-                "apply_text_normalization": "auto",
-                "optimize_streaming_latency": 0  # Prioritize quality over speed
+                "Content-Type": "application/json"
             }
             
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            with self._upstream_slots:
+                response = self.session.post(url, json=self._tts_payload(text), headers=headers, timeout=30)
             
             if response.status_code == 200:
-                print(f"STROKE SUCCESS: Generated smooth, fluent speech for stroke patient")
+                logger.info("Generated smooth, fluent speech for stroke patient")
                 return response.content
             else:
-                print(f"STROKE ERROR: Speech generation failed: {response.status_code} - {response.text}")
+                logger.error("Speech generation failed: %s - %s", response.status_code, response.text)
                 raise Exception(f"Speech generation failed: {response.status_code}")
                         
         except Exception as e:
-            print(f"STROKE ERROR: Speech generation failed: {str(e)}")
+            logger.error("Speech generation failed: %s", e)
             raise Exception(f"Speech generation failed: {str(e)}")
     
+    def stream_speech(self, text: str, voice_id: str = None, chunk_size: int = 4096):
+        """Start a streaming ElevenLabs TTS request and return an iterator over MP3 chunks"""
+        if not voice_id:
+            voice_id = self.fallback_voices["mature_male"]
+        
+        logger.debug("Streaming speech with voice ID: %s", voice_id)
+        
+        url = f"{self.elevenlabs_base_url}/text-to-speech/{voice_id}/stream"
+        headers = {
+            "Accept": "audio/mpeg",
+            "Content-Type": "application/json"
+        }
+        
+        with self._upstream_slots:
+            response = self.session.post(url, json=self._tts_payload(text), headers=headers, stream=True, timeout=30)
+        
+        # Fail before any audio is sent so the route can still return a JSON error
+        if response.status_code != 200:
+            detail = response.text
+            response.close()
+            logger.error("Speech streaming failed: %s - %s", response.status_code, detail)
+            raise Exception(f"Speech generation failed: {response.status_code}")
+        
+        def chunks():
+            try:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if chunk:
+                        yield chunk
+            finally:
+                response.close()
+        
+        return chunks()
+    
     def delete_voice(self, voice_id: str) -> bool:
         """Delete a cloned voice from ElevenLabs"""
         try:
             url = f"{self.elevenlabs_base_url}/voices/{voice_id}"
-            headers = {"xi-api-key": ELEVENLABS_API_KEY}
             
-            response = requests.delete(url, headers=headers, timeout=30)
+            response = self.session.delete(url, timeout=30)
             
             if response.status_code == 200:
-                print(f"STROKE DEBUG: Voice {voice_id} deleted successfully")
+                logger.debug("Voice %s deleted successfully", voice_id)
+                self.invalidate_voices_cache()
                 return True
             elif response.status_code == 422:
-                print(f"STROKE DEBUG: Voice {voice_id} not found or already deleted")
+                logger.debug("Voice %s not found or already deleted", voice_id)
+                self.invalidate_voices_cache()
                 return True  # Consider this success since voice is gone
             else:
-                print(f"STROKE WARNING: Failed to delete voice {voice_id}: {response.status_code}")
+                logger.warning("Failed to delete voice %s: %s", voice_id, response.status_code)
                 return False
         except Exception as e:
-            print(f"STROKE WARNING: Error deleting voice {voice_id}: {e}")
+            logger.warning("Error deleting voice %s: %s", voice_id, e)
             return False
+    
+    def get_voices_response(self, max_age=VOICES_CACHE_TTL):
+        """GET /voices, reusing the last successful response for up to max_age seconds"""
+        cached = self._voices_cache
+        if cached is not None and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+        
+        fetched_at = time.monotonic()
+        response = self.session.get(f"{self.elevenlabs_base_url}/voices", timeout=30)
+        if response.status_code == 200:
+            self._voices_cache = (fetched_at, response)
+        return response
+    
+    def invalidate_voices_cache(self):
+        """Drop the cached voice list after this app adds or removes a voice"""
+        self._voices_cache = None
 
 # Initialize stroke-optimized speech processor
 speech_processor = StrokeOptimizedSpeechProcessor()
 
+# Reusable temp WAV paths, on tmpfs when available, so each upload truncates an
+# existing file instead of creating and unlinking a new inode
+TEMP_WAV_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+TEMP_WAV_POOL_SIZE = 32
+temp_wav_pool = queue.Queue(maxsize=TEMP_WAV_POOL_SIZE)
+
+def create_temp_wav():
+    """Create an empty temp WAV file and return its path"""
+    fd, path = tempfile.mkstemp(suffix=".wav", prefix="stroke_voice_", dir=TEMP_WAV_DIR)
+    os.close(fd)
+    return path
+
+def acquire_temp_wav():
+    """Take a temp WAV path from the pool, creating a new one if the pool is empty"""
+    try:
+        return temp_wav_pool.get_nowait()
+    except queue.Empty:
+        return create_temp_wav()
+
+def release_temp_wav(path):
+    """Truncate a temp WAV and return it to the pool, deleting it if the pool is full"""
+    try:
+        os.truncate(path, 0)
+        temp_wav_pool.put_nowait(path)
+    except (OSError, queue.Full):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+def remove_pooled_temp_wavs():
+    """Delete the pooled temp files on shutdown"""
+    while True:
+        try:
+            os.unlink(temp_wav_pool.get_nowait())
+        except queue.Empty:
+            return
+        except OSError:
+            pass
+
+for _ in range(TEMP_WAV_POOL_SIZE):
+    temp_wav_pool.put_nowait(create_temp_wav())
+atexit.register(remove_pooled_temp_wavs)
+
+def save_upload_to_temp(audio_file):
+    """Stream an uploaded file into a pooled temp WAV in 1 MiB chunks and return its path"""
+    temp_path = acquire_temp_wav()
+    try:
+        with open(temp_path, "wb") as temp_file:
+            shutil.copyfileobj(audio_file.stream, temp_file, length=1024 * 1024)
+    except Exception:
+        release_temp_wav(temp_path)
+        raise
+    return temp_path
+
+# Post-response cleanup (temp files, temporary voice clones) runs here so the
+# request thread can return as soon as its response is built
+cleanup_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="cleanup")
+
+def cleanup_speech_request(temp_audio_path, cloned_voice_id=None, transcribe_future=None, clone_future=None):
+    """Release a request's temp file and delete its temporary voice clone"""
+    # Let abandoned work finish reading the temp file before it goes back to the pool,
+    # and collect an abandoned clone's voice so it can be deleted below
+    if transcribe_future is not None:
+        try:
+            transcribe_future.result()
+        except Exception:
+            pass
+    if clone_future is not None:
+        try:
+            cloned_voice_id, _ = clone_future.result()
+        except Exception:
+            pass
+    
+    if temp_audio_path:
+        release_temp_wav(temp_audio_path)
+        logger.debug("Cleaned up temp file")
+    
+    if cloned_voice_id:
+        try:
+            speech_processor.delete_voice(cloned_voice_id)
+            logger.debug("Deleted temporary voice clone")
+        except Exception as e:
+            logger.warning("Could not delete temporary voice: %s", e)
+
+# In-flight process-speech-fast runs keyed by speech_request_key, so concurrent
+# identical submissions wait on one pipeline instead of cloning and billing twice
+inflight_speech = {}
+inflight_speech_lock = threading.Lock()
+
+def clone_voice_timed(name, audio_file_path):
+    """Clone a voice on the executor and report how long the clone took"""
+    clone_start = time.time()
+    voice_id = speech_processor.clone_voice_with_enhancement(name, audio_file_path)
+    return voice_id, time.time() - clone_start
+
 @app.route('/api/create-voice-profile', methods=['POST'])
 def create_voice_profile():
     """Create a permanent voice profile for stroke patients"""
@@ -920,9 +1435,7 @@ def create_voice_profile():
             return jsonify({"error": "No file selected"}), 400
         
         # Save uploaded audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            audio_file.save(temp_file.name)
-            temp_audio_path = temp_file.name
+        temp_audio_path = save_upload_to_temp(audio_file)
         
         try:
             # Enhanced voice cloning for stroke patients
@@ -937,10 +1450,7 @@ def create_voice_profile():
             
         finally:
             # Clean up
-            try:
-                os.unlink(temp_audio_path)
-            except:
-                pass
+            release_temp_wav(temp_audio_path)
                 
     except Exception as e:
         return jsonify({
@@ -948,11 +1458,144 @@ def create_voice_profile():
             "recommendation": "For best results, record 20-30 seconds in a very quiet room, speaking as clearly as possible."
         }), 500
 
+def speech_request_key(temp_audio_path, voice_id, auto_clone):
+    """Single-flight key: a hash of the uploaded audio plus the options that change the output"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(temp_audio_path, "rb") as audio_file:
+        # Hash straight from the page cache; mmap cannot map an empty file
+        if os.fstat(audio_file.fileno()).st_size:
+            with mmap.mmap(audio_file.fileno(), 0, access=mmap.ACCESS_READ) as audio_map:
+                digest.update(audio_map)
+    return digest.digest(), voice_id, auto_clone
+
+def run_speech_pipeline(temp_audio_path, voice_id, auto_clone, start_time):
+    """Transcribe, clone, enhance and synthesize one recording; returns (response body, status)"""
+    cloned_voice_id = None
+    clone_future = None
+    transcribe_future = None
+    
+    try:
+        # Step 1: Enhanced transcription for stroke speech, running on the executor
+        # while the clarity assessment and voice clone proceed alongside it
+        transcribe_start = time.time()
+        transcribe_future = executor.submit(speech_processor.transcribe_audio_fast, temp_audio_path)
+        
+        # Step 2: Smart voice cloning strategy
+        clone_time = 0
+        auto_cloned = False
+        clone_error = None
+        can_clone = False
+        
+        if not voice_id and auto_clone:
+            # Assess if speech is clear enough for cloning
+            assessment_future = executor.submit(speech_processor.assess_speech_clarity, temp_audio_path)
+            can_clone, assessment_message = assessment_future.result()
+            logger.debug("Speech assessment: %s", assessment_message)
+            
+            if can_clone:
+                logger.debug("Attempting enhanced voice clone...")
+                clone_future = executor.submit(clone_voice_timed, "AutoStroke", temp_audio_path)
+        
+        pending_transcription, transcribe_future = transcribe_future, None
+        original_text = pending_transcription.result()
+        transcribe_time = time.time() - transcribe_start
+        
+        logger.debug("Transcribed: '%s' in %.2fs", original_text, transcribe_time)
+        
+        # Step 3: Enhanced text processing for stroke patients, hidden behind the clone upload
+        process_start = time.time()
+        enhance_future = executor.submit(speech_processor.enhance_text_for_stroke_patients, original_text)
+        
+        if not voice_id and auto_clone:
+            if can_clone:
+                pending_clone, clone_future = clone_future, None
+                try:
+                    cloned_voice_id, clone_time = pending_clone.result()
+                    voice_id = cloned_voice_id
+                    
+                    auto_cloned = True
+                    logger.info("Voice cloned successfully in %.2fs", clone_time)
+                    
+                except Exception as e:
+                    clone_error = str(e)
+                    logger.warning("Auto-cloning failed: %s", clone_error)
+                    # Select best fallback voice
+                    voice_id = speech_processor.select_best_fallback_voice(original_text)
+                    auto_cloned = False
+                    logger.info("Fallback: using optimized voice: %s", voice_id)
+            else:
+                clone_error = f"Speech clarity insufficient: {assessment_message}"
+                voice_id = speech_processor.select_best_fallback_voice(original_text)
+                logger.info("Fallback: using optimized voice due to clarity: %s", voice_id)
+        
+        enhanced_text = enhance_future.result()
+        
+        # Generate clear speech
+        try:
+            audio_data = speech_processor.generate_speech_fast(enhanced_text, voice_id)
+            speech_generation_success = True
+            logger.info("Generated clear speech response")
+        except Exception as e:
+            logger.warning("Speech generation failed: %s", e)
+            # Ultimate fallback
+            audio_data = speech_processor.generate_speech_fast(enhanced_text, speech_processor.fallback_voices["mature_male"])
+            speech_generation_success = False
+            clone_error = f"Used backup voice due to generation error: {e}"
+        
+        process_time = time.time() - process_start
+        total_time = time.time() - start_time
+        
+        detected_language = speech_processor.detected_language
+        response_data = {
+            "success": True,
+            "original_text": original_text,
+            "enhanced_text": enhanced_text,
+            "audio_base64": base64.b64encode(audio_data).decode('ascii'),
+            "timing": {
+                "transcription": round(transcribe_time, 2),
+                "voice_cloning": round(clone_time, 2),
+                "processing": round(process_time, 2),
+                "total": round(total_time, 2)
+            },
+            "voice_used": voice_id or "default",
+            "auto_cloned": auto_cloned,
+            "speech_generation_success": speech_generation_success,
+            "stroke_optimized": True,
+            "clarity_enhanced": enhanced_text != original_text,
+            "detected_language": detected_language,
+            "language_supported": speech_processor.is_language_well_supported(detected_language),
+            "model_used": speech_processor.get_best_model_for_language(detected_language)
+        }
+        
+        # Add helpful information for stroke patients
+        if clone_error:
+            response_data["voice_info"] = clone_error
+        elif auto_cloned:
+            response_data["voice_info"] = "Successfully used your cloned voice for clear speech"
+        else:
+            response_data["voice_info"] = "Used optimized voice for maximum clarity"
+            
+        return response_data, 200
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.error("Speech processing failed: %s", error_msg)
+                
+        return {
+            "error": error_msg,
+            "success": False,
+            "stroke_optimized": True,
+            "recommendation": "Try speaking more slowly and clearly, or record in a quieter environment."
+        }, 500
+        
+    finally:
+        # Clean up temp file and temporary cloned voice after the response is sent
+        cleanup_executor.submit(cleanup_speech_request, temp_audio_path, cloned_voice_id, transcribe_future, clone_future)
+
 @app.route('/api/process-speech-fast', methods=['POST'])
 def process_speech_fast():
     """STROKE-OPTIMIZED speech processing with enhanced clarity"""
     start_time = time.time()
-    cloned_voice_id = None
     
     try:
         # Check if file was uploaded
@@ -967,133 +1610,45 @@ def process_speech_fast():
             return jsonify({"error": "No file selected"}), 400
         
         # Save uploaded audio
-        temp_audio_path = None
+        temp_audio_path = save_upload_to_temp(audio_file)
+        
+        logger.debug("Processing speech file: %s", temp_audio_path)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("File size: %s bytes", os.path.getsize(temp_audio_path))
+        
+        # Identical in-flight requests (double submits, client retries) share one pipeline run
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav", prefix="stroke_voice_") as temp_file:
-                audio_file.save(temp_file.name)
-                temp_audio_path = temp_file.name
-                
-            print(f"STROKE DEBUG: Processing speech file: {temp_audio_path}")
-            print(f"STROKE DEBUG: File size: {os.path.getsize(temp_audio_path)} bytes")
-            
-            # Step 1: Enhanced transcription for stroke speech
-            transcribe_start = time.time()
-            original_text = speech_processor.transcribe_audio_fast(temp_audio_path)
-            transcribe_time = time.time() - transcribe_start
-            
-            print(f"STROKE DEBUG: Transcribed: '{original_text}' in {transcribe_time:.2f}s")
-            
-            # Step 2: Smart voice cloning strategy
-            clone_time = 0
-            auto_cloned = False
-            clone_error = None
-            
-            if not voice_id and auto_clone:
-                # Assess if speech is clear enough for cloning
-                can_clone, assessment_message = speech_processor.assess_speech_clarity(temp_audio_path)
-                print(f"STROKE DEBUG: Speech assessment: {assessment_message}")
-                
-                if can_clone:
-                    try:
-                        clone_start = time.time()
-                        print("STROKE DEBUG: Attempting enhanced voice clone...")
-                        
-                        cloned_voice_id = speech_processor.clone_voice_with_enhancement("AutoStroke", temp_audio_path)
-                        voice_id = cloned_voice_id
-                        
-                        clone_time = time.time() - clone_start
-                        auto_cloned = True
-                        print(f"STROKE SUCCESS: Voice cloned successfully in {clone_time:.2f}s")
-                        
-                    except Exception as e:
-                        clone_error = str(e)
-                        print(f"STROKE WARNING: Auto-cloning failed: {clone_error}")
-                        # Select best fallback voice
-                        voice_id = speech_processor.select_best_fallback_voice(original_text)
-                        auto_cloned = False
-                        print(f"STROKE FALLBACK: Using optimized voice: {voice_id}")
-                else:
-                    clone_error = f"Speech clarity insufficient: {assessment_message}"
-                    voice_id = speech_processor.select_best_fallback_voice(original_text)
-                    print(f"STROKE FALLBACK: Using optimized voice due to clarity: {voice_id}")
-            
-            # Step 3: Enhanced text processing for stroke patients
-            process_start = time.time()
-            enhanced_text = speech_processor.enhance_text_for_stroke_patients(original_text)
-            
-            # Generate clear speech
-            try:
-                audio_data = speech_processor.generate_speech_fast(enhanced_text, voice_id)
-                speech_generation_success = True
-                print(f"STROKE SUCCESS: Generated clear speech response")
-            except Exception as e:
-                print(f"STROKE WARNING: Speech generation failed: {e}")
-                # Ultimate fallback
-                audio_data = speech_processor.generate_speech_fast(enhanced_text, speech_processor.fallback_voices["mature_male"])
-                speech_generation_success = False
-                clone_error = f"Used backup voice due to generation error: {e}"
-            
-            process_time = time.time() - process_start
-            total_time = time.time() - start_time
-            
-            response_data = {
-                "success": True,
-                "original_text": original_text,
-                "enhanced_text": enhanced_text,
-                "audio_base64": audio_data.hex(),
-                "timing": {
-                    "transcription": round(transcribe_time, 2),
-                    "voice_cloning": round(clone_time, 2),
-                    "processing": round(process_time, 2),
-                    "total": round(total_time, 2)
-                },
-                "voice_used": voice_id or "default",
-                "auto_cloned": auto_cloned,
-                "speech_generation_success": speech_generation_success,
-                "stroke_optimized": True,
-                "clarity_enhanced": enhanced_text != original_text,
-                "detected_language": getattr(speech_processor, 'detected_language', 'unknown'),
-                "language_supported": speech_processor.is_language_well_supported(getattr(speech_processor, 'detected_language', 'en')),
-                "model_used": speech_processor.get_best_model_for_language(getattr(speech_processor, 'detected_language', 'en'))
-            }
-            
-            # Add helpful information for stroke patients
-            if clone_error:
-                response_data["voice_info"] = clone_error
-            elif auto_cloned:
-                response_data["voice_info"] = "Successfully used your cloned voice for clear speech"
-            else:
-                response_data["voice_info"] = "Used optimized voice for maximum clarity"
-                
-            return jsonify(response_data)
-            
+            key = speech_request_key(temp_audio_path, voice_id, auto_clone)
+        except Exception:
+            release_temp_wav(temp_audio_path)
+            raise
+        with inflight_speech_lock:
+            shared_future = inflight_speech.get(key)
+            if shared_future is None:
+                inflight_speech[key] = pipeline_future = Future()
+        
+        if shared_future is not None:
+            release_temp_wav(temp_audio_path)
+            logger.debug("Joining identical in-flight speech request")
+            response_data, status = shared_future.result()
+            return jsonify(response_data), status
+        
+        try:
+            result = run_speech_pipeline(temp_audio_path, voice_id, auto_clone, start_time)
+            pipeline_future.set_result(result)
+        except BaseException as e:
+            pipeline_future.set_exception(e)
+            raise
         finally:
-            # Clean up temp file
-            if temp_audio_path and os.path.exists(temp_audio_path):
-                try:
-                    os.unlink(temp_audio_path)
-                    print(f"STROKE DEBUG: Cleaned up temp file")
-                except Exception as e:
-                    print(f"STROKE WARNING: Could not delete temp file: {e}")
-            
-            # Immediately delete temporary cloned voice
-            if cloned_voice_id:
-                try:
-                    speech_processor.delete_voice(cloned_voice_id)
-                    print(f"STROKE DEBUG: Deleted temporary voice clone")
-                except Exception as e:
-                    print(f"STROKE WARNING: Could not delete temporary voice: {e}")
+            with inflight_speech_lock:
+                inflight_speech.pop(key, None)
+        
+        response_data, status = result
+        return jsonify(response_data), status
                     
     except Exception as e:
         error_msg = str(e)
-        print(f"STROKE ERROR: Speech processing failed: {error_msg}")
-        
-        # Clean up on error
-        if cloned_voice_id:
-            try:
-                speech_processor.delete_voice(cloned_voice_id)
-            except:
-                pass
+        logger.error("Speech processing failed: %s", error_msg)
                 
         return jsonify({
             "error": error_msg,
@@ -1102,6 +1657,58 @@ def process_speech_fast():
             "recommendation": "Try speaking more slowly and clearly, or record in a quieter environment."
         }), 500
 
+@app.route('/api/process-speech-stream', methods=['POST'])
+def process_speech_stream():
+    """Streaming variant of process-speech-fast: audio/mpeg is sent as ElevenLabs synthesizes it"""
+    start_time = time.time()
+    
+    try:
+        if 'audio' not in request.files:
+            return jsonify({"error": "No audio file provided"}), 400
+        
+        audio_file = request.files['audio']
+        voice_id = request.form.get('voice_id')
+        
+        if audio_file.filename == '':
+            return jsonify({"error": "No file selected"}), 400
+        
+        temp_audio_path = save_upload_to_temp(audio_file)
+        try:
+            transcribe_start = time.time()
+            original_text = speech_processor.transcribe_audio_fast(temp_audio_path)
+            transcribe_time = time.time() - transcribe_start
+        finally:
+            release_temp_wav(temp_audio_path)
+        
+        process_start = time.time()
+        enhanced_text = speech_processor.enhance_text_for_stroke_patients(original_text)
+        if not voice_id:
+            voice_id = speech_processor.select_best_fallback_voice(original_text)
+        
+        audio_chunks = speech_processor.stream_speech(enhanced_text, voice_id)
+        process_time = time.time() - process_start
+        
+        # Metadata travels in headers because the body is the audio itself
+        response = Response(stream_with_context(audio_chunks), mimetype="audio/mpeg")
+        response.headers["X-Voice-Used"] = voice_id
+        response.headers["X-Original-Text"] = quote(original_text)
+        response.headers["X-Enhanced-Text"] = quote(enhanced_text)
+        response.headers["Server-Timing"] = (
+            f"transcription;dur={transcribe_time * 1000:.0f}, "
+            f"processing;dur={process_time * 1000:.0f}, "
+            f"total;dur={(time.time() - start_time) * 1000:.0f}"
+        )
+        return response
+        
+    except Exception as e:
+        logger.error("Streaming speech processing failed: %s", e)
+        return jsonify({
+            "error": str(e),
+            "success": False,
+            "stroke_optimized": True,
+            "recommendation": "Try speaking more slowly and clearly, or record in a quieter environment."
+        }), 500
+
 @app.route('/api/test-voice-clone', methods=['POST'])
 def test_voice_clone():
     """Test voice cloning functionality for stroke patients"""
@@ -1112,9 +1719,7 @@ def test_voice_clone():
         audio_file = request.files['audio']
         test_name = request.form.get('name', 'StrokeTest')
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            audio_file.save(temp_file.name)
-            temp_path = temp_file.name
+        temp_path = save_upload_to_temp(audio_file)
         
         try:
             # Test speech clarity assessment
@@ -1140,7 +1745,7 @@ def test_voice_clone():
                 })
             
         finally:
-            os.unlink(temp_path)
+            cleanup_executor.submit(release_temp_wav, temp_path)
             
     except Exception as e:
         return jsonify({
@@ -1153,10 +1758,7 @@ def test_voice_clone():
 def get_voices():
     """Get available voices including stroke-optimized options"""
     try:
-        response = requests.get(
-            f"{speech_processor.elevenlabs_base_url}/voices",
-            headers={"xi-api-key": ELEVENLABS_API_KEY}
-        )
+        response = speech_processor.get_voices_response()
 
         if response.status_code == 200:
             data = response.json()
@@ -1211,27 +1813,35 @@ def speed_test():
     start = time.time()
     
     # Test OpenAI
-    try:
-        openai_start = time.time()
-        openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": "Hi"}],
-            max_tokens=1
-        )
-        openai_time = time.time() - openai_start
-    except Exception as e:
-        openai_time = f"Error: {str(e)}"
+    def ping_openai():
+        try:
+            openai_start = time.time()
+            openai_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": "Hi"}],
+                max_tokens=1
+            )
+            return time.time() - openai_start
+        except Exception as e:
+            return f"Error: {str(e)}"
     
     # Test ElevenLabs
-    try:
-        el_start = time.time()
-        requests.get(
-            f"{speech_processor.elevenlabs_base_url}/voices",
-            headers={"xi-api-key": ELEVENLABS_API_KEY}
-        )
-        el_time = time.time() - el_start
-    except Exception as e:
-        el_time = f"Error: {str(e)}"
+    def ping_elevenlabs():
+        try:
+            el_start = time.time()
+            speech_processor.session.get(
+                f"{speech_processor.elevenlabs_base_url}/voices",
+                timeout=30
+            )
+            return time.time() - el_start
+        except Exception as e:
+            return f"Error: {str(e)}"
+    
+    # Probe both APIs at once so the test takes the slower ping, not the sum
+    with ThreadPoolExecutor(max_workers=2) as probe_pool:
+        openai_future = probe_pool.submit(ping_openai)
+        el_future = probe_pool.submit(ping_elevenlabs)
+        openai_time, el_time = openai_future.result(), el_future.result()
     
     total = time.time() - start
     
@@ -1269,9 +1879,7 @@ def debug_voice_clone():
         audio_file = request.files['audio']
         debug_info.append(f"✅ Audio file received: {audio_file.filename}")
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            audio_file.save(temp_file.name)
-            temp_path = temp_file.name
+        temp_path = save_upload_to_temp(audio_file)
             
         file_size = os.path.getsize(temp_path)
         debug_info.append(f"📁 File saved, size: {file_size} bytes")
@@ -1285,7 +1893,6 @@ def debug_voice_clone():
                 debug_info.append("🎤 Attempting stroke-optimized voice clone...")
                 
                 url = f"{speech_processor.elevenlabs_base_url}/voices/add"
-                headers = {"xi-api-key": ELEVENLABS_API_KEY}
                 
                 with open(temp_path, "rb") as audio_file:
                     files = {"files": ("stroke_debug.wav", audio_file, "audio/wav")}
@@ -1296,7 +1903,7 @@ def debug_voice_clone():
                         "enhance_audio_quality": "true"
                     }
                     
-                    response = requests.post(url, headers=headers, files=files, data=data, timeout=120)
+                    response = speech_processor.session.post(url, files=files, data=data, timeout=120)
                 
                 debug_info.append(f"📬 Clone response: {response.status_code}")
                 
@@ -1314,7 +1921,7 @@ def debug_voice_clone():
                     
                     # Cleanup
                     try:
-                        delete_response = requests.delete(f"{speech_processor.elevenlabs_base_url}/voices/{voice_id}", headers=headers)
+                        delete_response = speech_processor.session.delete(f"{speech_processor.elevenlabs_base_url}/voices/{voice_id}", timeout=30)
                         debug_info.append(f"🗑️ Cleanup: {delete_response.status_code}")
                     except:
                         debug_info.append("🗑️ Cleanup failed")
@@ -1354,11 +1961,8 @@ def debug_voice_clone():
                 })
                 
         finally:
-            try:
-                os.unlink(temp_path)
-                debug_info.append("🧹 Temp file cleaned")
-            except:
-                debug_info.append("🧹 Cleanup failed")
+            release_temp_wav(temp_path)
+            debug_info.append("🧹 Temp file cleaned")
                 
     except Exception as e:
         debug_info.append(f"💥 ERROR: {str(e)}")
@@ -1372,9 +1976,9 @@ def debug_voice_clone():
 @app.route('/api/quick-test', methods=['GET'])
 def quick_test():
     try:
-        response = requests.get(
+        response = speech_processor.session.get(
             f"{speech_processor.elevenlabs_base_url}/voices",
-            headers={"xi-api-key": ELEVENLABS_API_KEY}
+            timeout=30
         )
         return jsonify({
             "api_key_works": response.status_code == 200,
@@ -1389,28 +1993,20 @@ def quick_test():
 def cleanup_voices():
     """Delete all custom voices to free up slots"""
     try:
-        response = requests.get(
-            f"{speech_processor.elevenlabs_base_url}/voices",
-            headers={"xi-api-key": ELEVENLABS_API_KEY}
-        )
+        response = speech_processor.get_voices_response(max_age=0)
         
         if response.status_code != 200:
             return jsonify({"error": "Failed to get voices"}), 400
             
         voices = response.json().get("voices", [])
+        cloned = [voice for voice in voices if voice.get("category") == "cloned"]
         deleted = []
         
-        for voice in voices:
-            if voice.get("category") == "cloned":
-                try:
-                    delete_response = requests.delete(
-                        f"{speech_processor.elevenlabs_base_url}/voices/{voice['voice_id']}",
-                        headers={"xi-api-key": ELEVENLABS_API_KEY}
-                    )
-                    if delete_response.status_code in [200, 422]:
-                        deleted.append(voice["name"])
-                except:
-                    pass
+        # Fan deletions out in parallel, bounded to stay within ElevenLabs rate limits
+        if cloned:
+            with ThreadPoolExecutor(max_workers=min(16, len(cloned))) as delete_pool:
+                results = delete_pool.map(lambda voice: speech_processor.delete_voice(voice["voice_id"]), cloned)
+                deleted = [voice["name"] for voice, success in zip(cloned, results) if success]
         
         return jsonify({
             "success": True,
@@ -1422,6 +2018,9 @@ def cleanup_voices():
     except Exception as e:
         return jsonify({"error": str(e), "stroke_optimized": True}), 500
 
+# Development server only. In production run `gunicorn -c gunicorn_conf.py wsgi:app`;
+# exec'ing gunicorn from here would first import this module and leak its temp
+# WAV pool and warmup calls, since exec skips atexit
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8000))
     app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
@@ -0,0 +1,11 @@
+import os
+
+# Gunicorn settings for app.py: pre-forked gevent workers so the IO-bound
+# OpenAI/ElevenLabs calls yield instead of pinning one request per worker.
+# Each worker multiplexes up to worker_connections requests on one event loop,
+# which gives the app ASGI-style concurrency without porting it off Flask
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+worker_class = "gevent"
+workers = int(os.environ.get("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2))
+worker_connections = int(os.environ.get("WORKER_CONNECTIONS", 1000))
+timeout = 180  # Voice cloning uploads can take minutes
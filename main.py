@@ -1,24 +1,31 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict
-import googlemaps
-import openai
-import json
+import orjson
 import re
-from geopy.geocoders import Nominatim
-from geopy.distance import geodesic
+import hashlib
+import time
+import numpy as np
 import asyncio
 import aiohttp
 import os
+import logging
 from datetime import datetime
+from collections import OrderedDict
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Per-place and per-query traces log at DEBUG; LOG_LEVEL=DEBUG turns them on
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
 # Initialize FastAPI app
-app = FastAPI(title="Ctrl+Z Stroke Care API", version="1.0.0")
+app = FastAPI(title="Ctrl+Z Stroke Care API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -34,14 +41,41 @@ GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 if not GOOGLE_MAPS_API_KEY or not OPENAI_API_KEY:
-    print(f"Google Maps API Key: {'Found' if GOOGLE_MAPS_API_KEY else 'Missing'}")
-    print(f"OpenAI API Key: {'Found' if OPENAI_API_KEY else 'Missing'}")
+    logger.error("Google Maps API Key: %s", 'Found' if GOOGLE_MAPS_API_KEY else 'Missing')
+    logger.error("OpenAI API Key: %s", 'Found' if OPENAI_API_KEY else 'Missing')
     raise ValueError("Missing required API keys in environment variables")
 
-# Initialize clients
-gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
-openai.api_key = OPENAI_API_KEY
-geolocator = Nominatim(user_agent="ctrl_z_stroke_locator")
+# The OpenAI SDK is imported on first use, so worker startup and /api/health
+# skip its import chain
+@lru_cache(maxsize=1)
+def get_openai():
+    """Async OpenAI client shared by all requests; its httpx pool keeps connections
+    alive and the SDK retries transient failures with backoff"""
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=2, timeout=60.0)
+
+# Chat completion replies keyed on a hash of the full request (model, messages,
+# temperature, max_tokens); the same facilities come back across searches
+AI_CACHE_TTL = 7 * 86400
+AI_CACHE_SIZE = 2048
+ai_cache = OrderedDict()
+
+# Text-search results keyed on (keyword, lat, lng, radius) with the coordinates
+# rounded to 2 decimals (~1 km), so nearby searches for the same city share them
+PLACES_CACHE_TTL = 24 * 3600
+PLACES_CACHE_SIZE = 1024
+places_cache = OrderedDict()
+
+@app.on_event("startup")
+async def open_http_session():
+    """Pooled aiohttp session for the Google Maps web services, shared by all requests"""
+    app.state.http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15))
+
+@app.on_event("shutdown")
+async def close_http_session():
+    await app.state.http.close()
+    if get_openai.cache_info().currsize:
+        await get_openai().close()
 
 # Pydantic models
 class SearchRequest(BaseModel):
@@ -126,88 +160,229 @@ STROKE_FACILITY_TYPES = {
     }
 }
 
-def geocode_location(location: str) -> tuple:
+def _compile_substring_matcher(needles):
+    """Build a one-pass equivalent of `{n for n in needles if n in text}`.
+    
+    A lookahead alternation (longest needle first) reports a match at every start
+    position in a single regex scan; shorter needles that are prefixes of the one
+    matched at a position are added back through a precomputed closure.
+    """
+    ordered = sorted(set(needles), key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))")
+    closure = {needle: frozenset(other for other in ordered if needle.startswith(other)) for needle in ordered}
+    
+    def matches(text):
+        found = set()
+        for match in pattern.finditer(text):
+            found |= closure[match.group(1)]
+        return found
+    return matches
+
+# Lowercased, precompiled forms of the tables above for calculate_relevance_score:
+# one regex scan per text finds every keyword word (or stroke keyword) it contains
+_SERVICE_MATCHERS = {
+    service: (
+        _compile_substring_matcher(word for keyword in keywords for word in keyword.lower().split()),
+        [frozenset(keyword.lower().split()) for keyword in keywords]
+    )
+    for service, keywords in SERVICE_KEYWORDS.items()
+}
+_STROKE_BOOSTS = [
+    (keyword.lower(), info['score_boost'])
+    for info in STROKE_FACILITY_TYPES.values()
+    for keyword in info['keywords']
+]
+_STROKE_MATCHER = _compile_substring_matcher(keyword for keyword, _ in _STROKE_BOOSTS)
+_MEDICAL_TYPES = frozenset(['hospital', 'doctor', 'health', 'medical_care'])
+
+# Place types that mark a search hit as a care provider worth a Details + AI lookup
+CARE_PROVIDER_TYPES = frozenset(['hospital', 'health', 'doctor', 'physiotherapist', 'medical_care'])
+# Support groups often meet at community organizations without a medical type, so
+# for this service the type only ranks candidates instead of excluding them
+TYPE_RANKED_ONLY_SERVICES = frozenset(['support_groups'])
+
+GOOGLE_MAPS_API_URL = "https://maps.googleapis.com/maps/api"
+
+async def gmaps_get(session: aiohttp.ClientSession, path: str, params: Dict) -> Dict:
+    """GET one Google Maps web-service endpoint, raising unless it answered OK or ZERO_RESULTS"""
+    async with session.get(f"{GOOGLE_MAPS_API_URL}/{path}/json", params={**params, 'key': GOOGLE_MAPS_API_KEY}) as response:
+        data = await response.json(loads=orjson.loads)
+    
+    status = data.get('status')
+    if status not in ('OK', 'ZERO_RESULTS'):
+        raise RuntimeError(f"{status}: {data.get('error_message', '')}")
+    return data
+
+# (lat, lng) or None per normalized location, least recently used evicted first
+GEOCODE_CACHE_SIZE = 4096
+geocode_cache = OrderedDict()
+
+async def _geocode_cached(session: aiohttp.ClientSession, normalized_location: str) -> Optional[tuple]:
+    """Geocode a normalized location string once; returns (lat, lng) or None if not found"""
+    if normalized_location in geocode_cache:
+        geocode_cache.move_to_end(normalized_location)
+        return geocode_cache[normalized_location]
+    
+    data = await gmaps_get(session, 'geocode', {'address': normalized_location})
+    coordinates = None
+    if data.get('results'):
+        location = data['results'][0]['geometry']['location']
+        coordinates = location['lat'], location['lng']
+    
+    geocode_cache[normalized_location] = coordinates
+    if len(geocode_cache) > GEOCODE_CACHE_SIZE:
+        geocode_cache.popitem(last=False)
+    return coordinates
+
+async def geocode_location(session: aiohttp.ClientSession, location: str) -> tuple:
     """Convert location string to coordinates"""
     try:
-        print(f"Geocoding location: {location}")
-        geocode_result = gmaps.geocode(location)
-        if geocode_result:
-            lat = geocode_result[0]['geometry']['location']['lat']
-            lng = geocode_result[0]['geometry']['location']['lng']
-            print(f"Geocoded to: {lat}, {lng}")
+        logger.debug("Geocoding location: %s", location)
+        coordinates = await _geocode_cached(session, " ".join(location.lower().split()))
+        if coordinates:
+            lat, lng = coordinates
+            logger.debug("Geocoded to: %s, %s", lat, lng)
             return lat, lng
         else:
             raise HTTPException(status_code=400, detail=f"Could not geocode location: {location}")
     except Exception as e:
-        print(f"Geocoding error: {e}")
+        logger.warning("Geocoding error: %s", e)
         raise HTTPException(status_code=400, detail=f"Geocoding error: {str(e)}")
 
-def search_places_by_service(lat: float, lng: float, service_type: str, radius_miles: int = 25) -> List[Dict]:
-    """Search for places using Google Places API based on service type"""
-    radius_meters = radius_miles * 1609.34  # Convert miles to meters
-    all_results = []
+async def fetch_places(session: aiohttp.ClientSession, path: str, params: Dict, label: str) -> List[Dict]:
+    """Run one Places web-service query and return its results"""
+    data = await gmaps_get(session, path, params)
+    
+    results = data.get('results', [])
+    if results:
+        logger.debug("Found %s %s", len(results), label)
+    return results
+
+async def cached_text_search(session: aiohttp.ClientSession, keyword: str, lat: float, lng: float, radius_miles: int) -> List[Dict]:
+    """Text search for one keyword around a ~1 km grid cell, reusing results from the last 24 h"""
+    lat, lng = round(lat, 2), round(lng, 2)
+    key = (keyword, lat, lng, radius_miles)
+    now = time.monotonic()
+    cached = places_cache.get(key)
+    if cached is not None and now - cached[0] < PLACES_CACHE_TTL:
+        places_cache.move_to_end(key)
+        return cached[1]
     
+    location = f"{lat},{lng}"
+    results = await fetch_places(session, 'place/textsearch', {
+        'query': f"{keyword} near {location}",
+        'location': location,
+        'radius': radius_miles * 1609.34  # Convert miles to meters
+    }, f"text search results for: {keyword}")
+    
+    places_cache[key] = (now, results)
+    places_cache.move_to_end(key)
+    if len(places_cache) > PLACES_CACHE_SIZE:
+        places_cache.popitem(last=False)
+    return results
+
+async def search_places_by_service(session: aiohttp.ClientSession, lat: float, lng: float, service_type: str, radius_miles: int = 25) -> List[Dict]:
+    """Search for places using Google Places API based on service type"""
     keywords = SERVICE_KEYWORDS.get(service_type, ['hospital'])
-    print(f"Searching for {service_type} with keywords: {keywords}")
-    
-    for keyword in keywords:
-        try:
-            # Text search for more specific results
-            places_result = gmaps.places_nearby(
-                location=(lat, lng),
-                radius=radius_meters,
-                keyword=keyword,
-                type='hospital'
-            )
-            
-            if places_result.get('results'):
-                print(f"Found {len(places_result['results'])} results for keyword: {keyword}")
-                all_results.extend(places_result['results'])
-            
-            # Also try a text search for better keyword matching
-            text_search = gmaps.places(
-                query=f"{keyword} near {lat},{lng}",
-                location=(lat, lng),
-                radius=radius_meters
-            )
-            
-            if text_search.get('results'):
-                print(f"Found {len(text_search['results'])} text search results for: {keyword}")
-                all_results.extend(text_search['results'])
-                
-        except Exception as e:
-            print(f"Error searching for {keyword}: {e}")
-            continue
+    logger.debug("Searching for %s with keywords: %s", service_type, keywords)
+    
+    # One text search per keyword, all at once. Text search matches keywords across
+    # every place type (nearby search was pinned to type=hospital) and returned
+    # nearly the same places, so running both doubled quota for little gain
+    responses = await asyncio.gather(
+        *[cached_text_search(session, keyword, lat, lng, radius_miles) for keyword in keywords],
+        return_exceptions=True
+    )
     
-    # Remove duplicates based on place_id
-    unique_results = {}
-    for place in all_results:
-        place_id = place.get('place_id')
-        if place_id and place_id not in unique_results:
-            unique_results[place_id] = place
+    # Remove duplicates based on place_id, noting how many new places each keyword added
+    seen_ids = set()
+    unique_results = []
+    for keyword, result in zip(keywords, responses):
+        if isinstance(result, Exception):
+            logger.warning("Error searching for %s: %s", keyword, result)
+            continue
+        added = 0
+        for place in result:
+            place_id = place.get('place_id')
+            if place_id and place_id not in seen_ids:
+                seen_ids.add(place_id)
+                unique_results.append(place)
+                added += 1
+        logger.debug("Keyword '%s' added %s new places", keyword, added)
     
-    print(f"Total unique places found: {len(unique_results)}")
-    return list(unique_results.values())
+    logger.info("Total unique places found: %s", len(unique_results))
+    return unique_results
 
-def get_place_details(place_id: str) -> Dict:
+# Place Details fields used when scoring and analyzing search results. Name,
+# geometry, rating and types already come with the search response; reviews and
+# opening hours (Atmosphere data, billed separately) are skipped for closed places
+PLACE_BASIC_FIELDS = [
+    'name', 'formatted_address', 'formatted_phone_number',
+    'website', 'business_status'
+]
+PLACE_ATMOSPHERE_FIELDS = ['reviews', 'opening_hours']
+PLACE_ALL_FIELDS = [
+    'name', 'formatted_address', 'formatted_phone_number',
+    'website', 'rating', 'opening_hours', 'types',
+    'reviews', 'geometry', 'business_status'
+]
+
+async def get_place_details(session: aiohttp.ClientSession, place_id: str, fields: List[str] = PLACE_ALL_FIELDS) -> Dict:
     """Get detailed information about a place"""
     try:
-        print(f"Getting details for place: {place_id}")
-        details = gmaps.place(
-            place_id=place_id,
-            fields=[
-                'name', 'formatted_address', 'formatted_phone_number',
-                'website', 'rating', 'opening_hours', 'types',
-                'reviews', 'geometry', 'business_status'
-            ]
-        )
+        logger.debug("Getting details for place: %s", place_id)
+        details = await gmaps_get(session, 'place/details', {'place_id': place_id, 'fields': ','.join(fields)})
         return details.get('result', {})
     except Exception as e:
-        print(f"Error getting place details for {place_id}: {e}")
+        logger.warning("Error getting place details for %s: %s", place_id, e)
         return {}
 
-def calculate_relevance_score(place: Dict, place_details: Dict, service_type: str, user_lat: float, user_lng: float) -> int:
-    """Calculate relevance score based on multiple factors"""
+EARTH_RADIUS_MILES = 3958.8
+
+def place_coordinate(place: Dict, axis: str) -> float:
+    """One coordinate of a Places result, NaN when the result has no geometry"""
+    return place.get('geometry', {}).get('location', {}).get(axis, np.nan)
+
+def haversine_miles(user_lat: float, user_lng: float, places: List[Dict]) -> np.ndarray:
+    """Great-circle distance in miles from the user to every place, in one vectorized pass.
+    Places without coordinates get NaN"""
+    lats = np.fromiter((place_coordinate(p, 'lat') for p in places), dtype=np.float64, count=len(places))
+    lngs = np.fromiter((place_coordinate(p, 'lng') for p in places), dtype=np.float64, count=len(places))
+    dlat = np.radians(lats - user_lat)
+    dlng = np.radians(lngs - user_lng)
+    a = np.sin(dlat / 2) ** 2 + np.cos(np.radians(user_lat)) * np.cos(np.radians(lats)) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+def prefilter_places(places: List[Dict], user_lat: float, user_lng: float, service_type: str, radius_miles: float, limit: int = 10) -> List[tuple]:
+    """Pick the (place, distance_miles) candidates worth the billed Details and AI calls.
+    
+    Drops places without coordinates or outside the radius and, except for TYPE_RANKED_ONLY_SERVICES, places
+    without a care-provider type; the rest are ranked by care-provider type, rating
+    and distance and cut to `limit`.
+    """
+    distances = haversine_miles(user_lat, user_lng, places)
+    candidates = []
+    for place, distance in zip(places, distances):
+        # Written so a NaN distance (no coordinates) is dropped too
+        if not distance <= radius_miles:
+            continue
+        is_provider = not CARE_PROVIDER_TYPES.isdisjoint(place.get('types', []))
+        if not is_provider and service_type not in TYPE_RANKED_ONLY_SERVICES:
+            continue
+        candidates.append((not is_provider, -(place.get('rating') or 0), float(distance), place))
+    
+    candidates.sort(key=lambda c: c[:3])
+    logger.info("Prefiltered %s places to %s candidates", len(places), len(candidates))
+    return [(place, distance) for _, _, distance, place in candidates[:limit]]
+
+def calculate_relevance_score(place: Dict, place_details: Dict, service_type: str, distance: float, radius_miles: Optional[float] = None) -> int:
+    """Calculate relevance score based on multiple factors; 0 means the facility is disqualified"""
+    # Cheap disqualifiers first, before any keyword scans
+    if place_details.get('business_status') == 'CLOSED_PERMANENTLY':
+        return 0
+    if radius_miles is not None and distance > radius_miles * 1.2:
+        return 0
+    
     base_score = 50
     
     name = place.get('name', '').lower()
@@ -215,22 +390,24 @@ def calculate_relevance_score(place: Dict, place_details: Dict, service_type: st
     types = place.get('types', [])
     
     # Service type matching
-    service_keywords = SERVICE_KEYWORDS.get(service_type, [])
-    for keyword in service_keywords:
-        if any(word in name for word in keyword.lower().split()):
-            base_score += 15
-        if any(word in address for word in keyword.lower().split()):
-            base_score += 5
+    if service_type in _SERVICE_MATCHERS:
+        matcher, keyword_words = _SERVICE_MATCHERS[service_type]
+        name_words = matcher(name)
+        address_words = matcher(address)
+        for words in keyword_words:
+            if not words.isdisjoint(name_words):
+                base_score += 15
+            if not words.isdisjoint(address_words):
+                base_score += 5
     
     # Stroke facility type bonuses
-    for facility_type, info in STROKE_FACILITY_TYPES.items():
-        for keyword in info['keywords']:
-            if keyword.lower() in name or keyword.lower() in address:
-                base_score += info['score_boost']
+    stroke_hits = _STROKE_MATCHER(name) | _STROKE_MATCHER(address)
+    for keyword, score_boost in _STROKE_BOOSTS:
+        if keyword in stroke_hits:
+            base_score += score_boost
     
     # Hospital/medical facility type bonus
-    medical_types = ['hospital', 'doctor', 'health', 'medical_care']
-    if any(t in types for t in medical_types):
+    if not _MEDICAL_TYPES.isdisjoint(types):
         base_score += 10
     
     # Rating bonus
@@ -241,10 +418,6 @@ def calculate_relevance_score(place: Dict, place_details: Dict, service_type: st
         base_score += 5
     
     # Distance penalty (closer is better)
-    place_lat = place['geometry']['location']['lat']
-    place_lng = place['geometry']['location']['lng']
-    distance = geodesic((user_lat, user_lng), (place_lat, place_lng)).miles
-    
     if distance <= 5:
         base_score += 5
     elif distance <= 10:
@@ -252,38 +425,71 @@ def calculate_relevance_score(place: Dict, place_details: Dict, service_type: st
     elif distance > 20:
         base_score -= 5
     
-    # Business status check
-    if place_details.get('business_status') == 'CLOSED_PERMANENTLY':
-        base_score -= 50
-    
     return min(max(base_score, 0), 100)  # Clamp between 0-100
 
-def analyze_facility_with_ai(place: Dict, place_details: Dict, service_type: str) -> tuple:
+async def cached_chat_completion(model: str, messages: List[Dict], max_tokens: int, temperature: float, response_format: Optional[Dict] = None) -> str:
+    """Return the reply text for a chat completion, reusing the reply to an identical earlier request"""
+    key = hashlib.sha256(orjson.dumps([model, messages, temperature, max_tokens, response_format], option=orjson.OPT_SORT_KEYS)).hexdigest()
+    now = time.monotonic()
+    cached = ai_cache.get(key)
+    if cached is not None and now - cached[0] < AI_CACHE_TTL:
+        ai_cache.move_to_end(key)
+        return cached[1]
+    
+    extra = {"response_format": response_format} if response_format else {}
+    response = await get_openai().chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        **extra
+    )
+    content = response.choices[0].message.content
+    
+    ai_cache[key] = (now, content)
+    ai_cache.move_to_end(key)
+    if len(ai_cache) > AI_CACHE_SIZE:
+        ai_cache.popitem(last=False)
+    return content
+
+def facility_summary(place: Dict, place_details: Dict, service_type: str) -> tuple:
+    """Facility fields and recent review text given to the AI analysis"""
+    facility_info = {
+        'name': place.get('name'),
+        'address': place_details.get('formatted_address'),
+        'types': place.get('types'),
+        'rating': place.get('rating'),
+        'phone': place_details.get('formatted_phone_number'),
+        'website': place_details.get('website'),
+        'service_requested': service_type
+    }
+    
+    # Get recent reviews for context
+    reviews = place_details.get('reviews', [])[:3]  # Last 3 reviews
+    review_text = ""
+    if reviews:
+        review_text = "\n".join([f"- {review.get('text', '')[:200]}..." for review in reviews])
+    
+    return facility_info, review_text
+
+def fallback_analysis(service_type: str) -> tuple:
+    """Generic analysis used when the AI call fails"""
+    fallback_reasoning = f"Medical facility offering {service_type.replace('_', ' ')} services in the area."
+    fallback_services = {service_type: True}
+    return fallback_reasoning, fallback_services, ['English']
+
+async def analyze_facility_with_ai(place: Dict, place_details: Dict, service_type: str) -> tuple:
     """Use AI to analyze facility and generate reasoning"""
     try:
-        print(f"Analyzing facility with AI: {place.get('name')}")
+        logger.debug("Analyzing facility with AI: %s", place.get('name'))
         
-        facility_info = {
-            'name': place.get('name'),
-            'address': place_details.get('formatted_address'),
-            'types': place.get('types'),
-            'rating': place.get('rating'),
-            'phone': place_details.get('formatted_phone_number'),
-            'website': place_details.get('website'),
-            'service_requested': service_type
-        }
-        
-        # Get recent reviews for context
-        reviews = place_details.get('reviews', [])[:3]  # Last 3 reviews
-        review_text = ""
-        if reviews:
-            review_text = "\n".join([f"- {review.get('text', '')[:200]}..." for review in reviews])
+        facility_info, review_text = facility_summary(place, place_details, service_type)
         
         prompt = f"""
         As a medical facility expert, analyze this healthcare facility for stroke care services.
         
         Facility Information:
-        {json.dumps(facility_info, indent=2)}
+        {orjson.dumps(facility_info, option=orjson.OPT_INDENT_2).decode()}
         
         Recent Reviews:
         {review_text}
@@ -310,52 +516,177 @@ def analyze_facility_with_ai(place: Dict, place_details: Dict, service_type: str
         }}
         """
         
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
+        # JSON mode guarantees a parseable object, so no prose preamble to budget for
+        ai_response = await cached_chat_completion(
+            model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a medical facility expert specializing in stroke care assessment. Always respond with valid JSON."},
                 {"role": "user", "content": prompt}
             ],
-            max_tokens=500,
-            temperature=0.3
+            max_tokens=250,
+            temperature=0.3,
+            response_format={"type": "json_object"}
         )
         
-        ai_response = response.choices[0].message.content
-        print(f"AI Response: {ai_response[:100]}...")
+        logger.debug("AI Response: %s...", ai_response[:100])
         
-        # Parse JSON response
-        try:
-            ai_data = json.loads(ai_response)
-            return ai_data.get('reasoning', ''), ai_data.get('services', {}), ai_data.get('languages', ['English'])
-        except json.JSONDecodeError:
-            # Fallback if AI doesn't return valid JSON
-            return ai_response[:200] + "...", {service_type: True}, ['English']
+        ai_data = orjson.loads(ai_response)
+        return ai_data.get('reasoning', ''), ai_data.get('services', {}), ai_data.get('languages', ['English'])
             
     except Exception as e:
-        print(f"AI analysis error: {e}")
+        logger.warning("AI analysis error: %s", e)
         # Fallback analysis
-        fallback_reasoning = f"Medical facility offering {service_type.replace('_', ' ')} services in the area."
-        fallback_services = {service_type: True}
-        return fallback_reasoning, fallback_services, ['English']
+        return fallback_analysis(service_type)
+
+async def batch_analyze_facilities_with_ai(facilities: List[tuple], service_type: str) -> List[Optional[tuple]]:
+    """Analyze all (place, place_details) pairs in one AI call.
+    
+    Returns one (reasoning, services, languages) tuple per facility, in order, with
+    None for any entry the model left out or returned malformed. Raises if the call
+    itself fails or the reply is not the expected JSON object.
+    """
+    logger.info("Analyzing %s facilities with AI in one request", len(facilities))
+    
+    entries = []
+    for i, (place, place_details) in enumerate(facilities):
+        facility_info, review_text = facility_summary(place, place_details, service_type)
+        del facility_info['service_requested']
+        entries.append({'index': i, **facility_info, 'recent_reviews': review_text})
+    
+    prompt = f"""
+    As a medical facility expert, analyze each of these healthcare facilities for stroke care services.
+    
+    Facilities:
+    {orjson.dumps(entries, option=orjson.OPT_INDENT_2).decode()}
+    
+    Service Requested: {service_type}
+    
+    For each facility provide:
+    1. A brief assessment (2-3 sentences) of why this facility is suitable for the requested service
+    2. Determine what services they likely offer (emergency, rehab_therapy, support_groups, stroke_certified)
+    3. Estimate what languages they might support based on location and type
+    
+    Return a JSON object with one entry per facility, in the same order:
+    {{
+        "results": [
+            {{
+                "index": facility index,
+                "reasoning": "Brief explanation of suitability",
+                "services": {{
+                    "emergency": boolean,
+                    "rehab_therapy": boolean,
+                    "support_groups": boolean,
+                    "stroke_certified": boolean,
+                    "neuro_icu": boolean,
+                    "rehabilitation": boolean
+                }},
+                "languages": ["list", "of", "likely", "languages"]
+            }}
+        ]
+    }}
+    """
+    
+    ai_response = await cached_chat_completion(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "You are a medical facility expert specializing in stroke care assessment. Always respond with valid JSON."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=250 * len(facilities) + 100,
+        temperature=0.3,
+        response_format={"type": "json_object"}
+    )
+    
+    items = orjson.loads(ai_response)['results']
+    
+    analyses = [None] * len(facilities)
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        index = item.get('index', position)
+        if not isinstance(index, int) or not 0 <= index < len(facilities) or analyses[index] is not None:
+            continue
+        services = item.get('services')
+        if not isinstance(item.get('reasoning'), str) or not isinstance(services, dict):
+            continue
+        analyses[index] = (item['reasoning'], services, item.get('languages') or ['English'])
+    return analyses
+
+async def fetch_facility_details(session: aiohttp.ClientSession, index: int, place: Dict, total: int) -> Optional[Dict]:
+    """Fetch place details for one facility; returns None when the place has no place_id"""
+    logger.debug("Processing facility %s/%s: %s", index + 1, total, place.get('name'))
+    
+    place_id = place.get('place_id')
+    if not place_id:
+        return None
+    
+    fields = PLACE_BASIC_FIELDS
+    if place.get('business_status') != 'CLOSED_PERMANENTLY':
+        fields = PLACE_BASIC_FIELDS + PLACE_ATMOSPHERE_FIELDS
+    return await get_place_details(session, place_id, fields)
+
+async def analyze_facilities(facilities: List[tuple], service_type: str) -> List[tuple]:
+    """AI analysis for every facility: one batched call, per-facility calls only for entries it could not cover"""
+    try:
+        analyses = await batch_analyze_facilities_with_ai(facilities, service_type)
+    except Exception as e:
+        logger.warning("Batch AI analysis error: %s", e)
+        analyses = [None] * len(facilities)
+    
+    missing = [i for i, analysis in enumerate(analyses) if analysis is None]
+    if missing:
+        retried = await asyncio.gather(*[
+            analyze_facility_with_ai(*facilities[i], service_type)
+            for i in missing
+        ])
+        for i, analysis in zip(missing, retried):
+            analyses[i] = analysis
+    return analyses
+
+def build_facility_result(place: Dict, place_details: Dict, analysis: tuple, distance: float, relevance_score: int) -> FacilityResult:
+    """Assemble the response entry for one analyzed facility"""
+    ai_reasoning, ai_services, ai_languages = analysis
+    
+    # Build facility result
+    facility = FacilityResult(
+        name=place.get('name', 'Unknown Facility'),
+        address=place_details.get('formatted_address', 'Address not available'),
+        distance_miles=round(distance, 1),
+        relevance_score=relevance_score,
+        services=Services(**ai_services),
+        languages=ai_languages,
+        ai_reasoning=ai_reasoning,
+        contact=Contact(
+            phone=place_details.get('formatted_phone_number'),
+            website=place_details.get('website')
+        ),
+        rating=place.get('rating'),
+        hours=place_details.get('opening_hours', {}).get('weekday_text', [''])[0] if place_details.get('opening_hours') else None,
+        place_id=place['place_id']
+    )
+    
+    logger.debug("Added facility: %s (Score: %s)", facility.name, facility.relevance_score)
+    return facility
 
 @app.post("/api/search", response_model=SearchResponse)
 async def search_stroke_facilities(request: SearchRequest):
     """Main search endpoint for stroke care facilities"""
     try:
-        print(f"Search request: {request}")
+        logger.info("Search request: %s", request)
         
         # Geocode the location
-        user_lat, user_lng = geocode_location(request.location)
+        user_lat, user_lng = await geocode_location(app.state.http, request.location)
         
         # Search for places
-        places = search_places_by_service(
+        places = await search_places_by_service(
+            app.state.http,
             user_lat, user_lng, 
             request.service, 
             request.radius_miles
         )
         
         if not places:
-            print("No places found")
+            logger.info("No places found")
             return SearchResponse(
                 results=[],
                 search_metadata={
@@ -367,63 +698,53 @@ async def search_stroke_facilities(request: SearchRequest):
                 }
             )
         
-        # Process each facility
+        # Keep only nearby care providers before any billed Details/AI calls
+        top_places = prefilter_places(
+            places, user_lat, user_lng, request.service, request.radius_miles
+        )  # Limit to top 10 results
+        
+        # Fetch details for all facilities concurrently
+        details = await asyncio.gather(
+            *[fetch_facility_details(app.state.http, i, place, len(top_places)) for i, (place, _) in enumerate(top_places)],
+            return_exceptions=True
+        )
+        
+        # Score before the AI call so disqualified facilities never reach it
+        detailed = []
+        distances = []
+        scores = []
+        for (place, distance), place_details in zip(top_places, details):
+            if isinstance(place_details, Exception):
+                logger.warning("Error processing facility: %s", place_details)
+                continue
+            if place_details is None:
+                continue
+            relevance_score = calculate_relevance_score(
+                place, place_details, request.service, distance, request.radius_miles
+            )
+            if relevance_score == 0:
+                logger.debug("Skipping disqualified facility: %s", place.get('name'))
+                continue
+            detailed.append((place, place_details))
+            distances.append(distance)
+            scores.append(relevance_score)
+        
+        # Analyze them all in a single AI request
+        analyses = await analyze_facilities(detailed, request.service) if detailed else []
+        
         facilities = []
-        for i, place in enumerate(places[:10]):  # Limit to top 10 results
+        for (place, place_details), analysis, distance, relevance_score in zip(detailed, analyses, distances, scores):
             try:
-                print(f"Processing facility {i+1}/{min(len(places), 10)}: {place.get('name')}")
-                
-                place_id = place.get('place_id')
-                if not place_id:
-                    continue
-                
-                # Get detailed information
-                place_details = get_place_details(place_id)
-                
-                # Calculate distance
-                place_lat = place['geometry']['location']['lat']
-                place_lng = place['geometry']['location']['lng']
-                distance = geodesic((user_lat, user_lng), (place_lat, place_lng)).miles
-                
-                # Calculate relevance score
-                relevance_score = calculate_relevance_score(
-                    place, place_details, request.service, user_lat, user_lng
-                )
-                
-                # AI analysis
-                ai_reasoning, ai_services, ai_languages = analyze_facility_with_ai(
-                    place, place_details, request.service
-                )
-                
-                # Build facility result
-                facility = FacilityResult(
-                    name=place.get('name', 'Unknown Facility'),
-                    address=place_details.get('formatted_address', 'Address not available'),
-                    distance_miles=round(distance, 1),
-                    relevance_score=relevance_score,
-                    services=Services(**ai_services),
-                    languages=ai_languages,
-                    ai_reasoning=ai_reasoning,
-                    contact=Contact(
-                        phone=place_details.get('formatted_phone_number'),
-                        website=place_details.get('website')
-                    ),
-                    rating=place.get('rating'),
-                    hours=place_details.get('opening_hours', {}).get('weekday_text', [''])[0] if place_details.get('opening_hours') else None,
-                    place_id=place_id
-                )
-                
-                facilities.append(facility)
-                print(f"Added facility: {facility.name} (Score: {facility.relevance_score})")
-                
+                facilities.append(build_facility_result(
+                    place, place_details, analysis, distance, relevance_score
+                ))
             except Exception as e:
-                print(f"Error processing facility: {e}")
-                continue
+                logger.warning("Error processing facility: %s", e)
         
         # Sort by relevance score (highest first)
         facilities.sort(key=lambda x: x.relevance_score, reverse=True)
         
-        print(f"Returning {len(facilities)} facilities")
+        logger.info("Returning %s facilities", len(facilities))
         
         return SearchResponse(
             results=facilities,
@@ -441,7 +762,7 @@ async def search_stroke_facilities(request: SearchRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Search error: {e}")
+        logger.error("Search error: %s", e)
         raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
 
 @app.get("/api/health")
@@ -461,7 +782,7 @@ async def health_check():
 async def get_facility_details_endpoint(place_id: str):
     """Get detailed information about a specific facility"""
     try:
-        place_details = get_place_details(place_id)
+        place_details = await get_place_details(app.state.http, place_id)
         if not place_details:
             raise HTTPException(status_code=404, detail="Facility not found")
         
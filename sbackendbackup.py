@@ -4,7 +4,7 @@ import requests
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import googlemaps
-import openai
+from openai import OpenAI
 from dotenv import load_dotenv
 from geopy.distance import geodesic
 
@@ -20,7 +20,7 @@ print(f"Google Maps API Key: {'Found' if GOOGLE_MAPS_API_KEY else 'Missing'}")
 print(f"OpenAI API Key: {'Found' if OPENAI_API_KEY else 'Missing'}")
 
 gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
-openai.api_key = OPENAI_API_KEY
+openai_client = OpenAI(api_key=OPENAI_API_KEY)
 
 @app.route('/api/health')
 def health():
@@ -108,7 +108,7 @@ def analyze_with_ai(name, types, service):
             
             Respond with JSON: {{"is_medical": true/false, "score": 0-100, "reason": "brief explanation"}}"""
         
-        ai_response = openai.ChatCompletion.create(
+        ai_response = openai_client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "Analyze facilities and respond only with valid JSON."},
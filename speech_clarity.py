@@ -1,21 +1,24 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import openai
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 import os
-import tempfile
 import asyncio
-import aiofiles
 from dotenv import load_dotenv
 import json
+import base64
+import hashlib
 import time
-import requests
+import re
+import httpx
 from concurrent.futures import ThreadPoolExecutor
-import threading
+from urllib.parse import quote
+from collections import OrderedDict
 
 load_dotenv()
 
-app = FastAPI(title="Ctrl+Z Speech Clarity API")
+app = FastAPI(title="Ctrl+Z Speech Clarity API", default_response_class=ORJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -26,141 +29,230 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize APIs (OpenAI v0.28.1 style)
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# Initialize APIs
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 
-# Thread pool for parallel processing
-executor = ThreadPoolExecutor(max_workers=3)
+# Default thread pool for the remaining blocking calls. The work is network I/O, so
+# size it well past the core count; SPEECH_POOL_SIZE overrides
+SPEECH_POOL_SIZE = int(os.getenv("SPEECH_POOL_SIZE", min(64, (os.cpu_count() or 4) * 5)))
+executor = ThreadPoolExecutor(max_workers=SPEECH_POOL_SIZE, thread_name_prefix="speech")
+
+# Enhanced transcripts kept per process; enhancement runs at temperature 0, so a
+# repeated utterance gets the same result without another OpenAI round trip
+ENHANCE_CACHE_SIZE = 1024
+
+# Uploaded audio stays in memory; this name tells Whisper and ElevenLabs the format
+UPLOAD_FILENAME = "audio.wav"
+# The multipart parser keeps uploads up to this size in memory; Starlette's 1 MiB
+# default would spill most speech clips to a temp file before the handler runs.
+# Tied to Starlette 0.14 (pinned by fastapi==0.68.2), where UploadFile.spool_max_size
+# sets the threshold; newer releases read MultiPartParser.spool_max_size instead,
+# so fail at import rather than silently lose the setting after an upgrade
+UPLOAD_SPOOL_MAX_SIZE = 4 * 1024 * 1024
+if not hasattr(StarletteUploadFile, "spool_max_size"):
+    raise RuntimeError("Starlette no longer has UploadFile.spool_max_size; move UPLOAD_SPOOL_MAX_SIZE to its multipart parser")
+StarletteUploadFile.spool_max_size = UPLOAD_SPOOL_MAX_SIZE
+
+# Transcripts are keyed without punctuation or filler words, so only utterances
+# with the same words in the same order share a cached enhancement
+ENHANCE_FILLERS = frozenset({'uh', 'um', 'er', 'ah', 'hmm'})
+# Transcripts under this many words, or already punctuated with no disfluencies,
+# are returned as-is instead of being sent for enhancement
+ENHANCE_MIN_WORDS = 4
+DISFLUENCY_PATTERN = re.compile(r"\b(?:u+m+|u+h+|e+r+|a+h+|h+m+|like|you know|i mean)\b|\b(\w+)\s+\1\b", re.IGNORECASE)
+
+# Synthesized speech kept per process, keyed by (voice, text digest); identical
+# requests already in flight share one ElevenLabs call
+TTS_CACHE_SIZE = 128
+TTS_CACHE_TTL = 600
+
+# Enhancement prompt pieces and fixed request parameters, built once at import
+ENHANCE_PROMPT_PREFIX = "Fix grammar and clarity, keep meaning: '"
+ENHANCE_PROMPT_SUFFIX = "'"
+ENHANCE_REQUEST_KWARGS = {
+    "model": "gpt-3.5-turbo",
+    "max_tokens": 100,  # Reduced tokens for speed
+    "temperature": 0,   # Deterministic for speed
+    "top_p": 1,
+    "frequency_penalty": 0,
+    "presence_penalty": 0
+}
+
+# Seconds the ElevenLabs voice catalog is served from memory; cloning a voice clears it
+VOICES_CACHE_TTL = float(os.getenv("VOICES_CACHE_TTL", 60))
+
+def spoken_words(text: str) -> list:
+    """Lower-cased words without surrounding punctuation; equal lists sound the same when spoken"""
+    words = (word.strip(".,!?;:'\"") for word in text.lower().split())
+    return [word for word in words if word]
+
+def normalize_transcript(text: str) -> list:
+    """Lower-cased words of a transcript without punctuation or filler words"""
+    words = (word.strip(".,!?'\"") for word in text.lower().split())
+    return [word for word in words if word and word not in ENHANCE_FILLERS]
+
+def needs_enhancement(text: str) -> bool:
+    """Cheap pre-check: short or already clean sentences are not worth a model call"""
+    text = text.strip()
+    if len(text.split()) < ENHANCE_MIN_WORDS:
+        return False
+    return text[-1] not in ".!?" or DISFLUENCY_PATTERN.search(text) is not None
 
 class OptimizedSpeechProcessor:
     def __init__(self):
         self.elevenlabs_base_url = "https://api.elevenlabs.io/v1"
-        # Pre-warm the models on startup
-        self._warmup()
+        # blake2b(normalized transcript) -> enhanced text, least recently used first
+        self._enhance_cache = OrderedDict()
+        # (monotonic fetch time, voice list) from the last successful /voices call
+        self._voices_cache = (0.0, None)
+        # (voice_id, text digest) -> (monotonic time, MP3 bytes), least recently used first
+        self._tts_cache = OrderedDict()
+        # (voice_id, text digest) -> [task synthesizing that speech right now, waiter count]
+        self._tts_inflight = {}
         
-    def _warmup(self):
-        """Pre-warm APIs to reduce first-request latency"""
-        try:
-            # Warm up OpenAI
-            threading.Thread(target=self._warmup_openai, daemon=True).start()
-            # Warm up ElevenLabs
-            threading.Thread(target=self._warmup_elevenlabs, daemon=True).start()
-        except:
-            pass  # Fail silently if warmup fails
-    
-    def _warmup_openai(self):
-        try:
-            openai.ChatCompletion.create(
+    async def warmup(self):
+        """Pre-warm APIs through the shared clients, so the first request reuses an
+        already negotiated TLS connection"""
+        # Fail silently if warmup fails
+        await asyncio.gather(
+            app.state.openai.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": "Hi"}],
                 max_tokens=1
-            )
-        except:
-            pass
-    
-    def _warmup_elevenlabs(self):
-        try:
-            requests.get(f"{self.elevenlabs_base_url}/voices", 
-                        headers={"xi-api-key": ELEVENLABS_API_KEY}, timeout=5)
-        except:
-            pass
+            ),
+            app.state.http.get(f"{self.elevenlabs_base_url}/voices", timeout=5),
+            return_exceptions=True
+        )
         
-    async def transcribe_audio_fast(self, audio_file_path: str) -> str:
+    async def transcribe_audio_fast(self, audio_bytes: bytes) -> str:
         """Fast transcription with optimized settings"""
         try:
-            def transcribe():
-                with open(audio_file_path, "rb") as audio_file:
-                    return openai.Audio.transcribe(
-                        model="whisper-1",
-                        file=audio_file,
-                        language="en",
-                        # Fast transcription settings
-                        response_format="text",
-                        temperature=0  # Deterministic for speed
-                    )
-            
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(executor, transcribe)
-            
-            # Handle both dict and string responses
-            if isinstance(result, dict):
-                return result.get("text", str(result))
-            return str(result)
+            # In-memory upload; the SDK takes the format from the file name
+            # response_format="text" comes back as a plain string
+            text = await app.state.openai.audio.transcriptions.create(
+                model="whisper-1",
+                file=(UPLOAD_FILENAME, audio_bytes),
+                language="en",
+                # Fast transcription settings
+                response_format="text",
+                temperature=0  # Deterministic for speed
+            )
+            return text.strip()
             
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
     
     async def enhance_text_fast(self, text: str) -> str:
         """Fast text enhancement with shorter prompt"""
+        if not needs_enhancement(text):
+            return text
+        
+        words = normalize_transcript(text)
+        cache_key = hashlib.blake2b(" ".join(words).encode(), digest_size=16).hexdigest()
+        cached = self._enhance_cache.get(cache_key)
+        if cached is not None:
+            self._enhance_cache.move_to_end(cache_key)
+            return cached
+        
         try:
             # Simplified prompt for speed
-            prompt = f"Fix grammar and clarity, keep meaning: '{text}'"
-            
-            def enhance():
-                return openai.ChatCompletion.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=100,  # Reduced tokens for speed
-                    temperature=0,   # Deterministic for speed
-                    top_p=1,
-                    frequency_penalty=0,
-                    presence_penalty=0
-                )
-            
-            # Run in thread pool
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(executor, enhance)
+            response = await app.state.openai.chat.completions.create(
+                messages=[{"role": "user", "content": ENHANCE_PROMPT_PREFIX + text + ENHANCE_PROMPT_SUFFIX}],
+                **ENHANCE_REQUEST_KWARGS
+            )
             
             enhanced_text = response.choices[0].message.content.strip()
             
             # Quick validation
             if len(enhanced_text) < 3:
                 return text
-                
+            
+            self._enhance_cache[cache_key] = enhanced_text
+            if len(self._enhance_cache) > ENHANCE_CACHE_SIZE:
+                self._enhance_cache.popitem(last=False)
             return enhanced_text
             
         except Exception as e:
             print(f"Enhancement error: {str(e)}")
             return text  # Return original if enhancement fails
     
+    def _tts_payload(self, text: str) -> dict:
+        """Request body shared by the buffered and streaming TTS calls"""
+        # Settings optimized for voice preservation and emotion
+        return {
+            "text": text,
+            "model_id": "eleven_multilingual_v2",  # Better for emotion preservation
+            "voice_settings": {
+                "stability": 0.4,  # Lower for more emotion variation
+                "similarity_boost": 0.8,  # Higher to preserve voice characteristics
+                "style": 0.3,  # Add some style variation
+                "use_speaker_boost": True  # Preserve speaker characteristics
+            }
+        }
+    
     async def generate_speech_fast(self, text: str, voice_id: str = None) -> bytes:
         """Fast speech generation with optimized settings"""
+        if not voice_id:
+            voice_id = "29vD33N1CtxCmqQRPOHJ"  # Default male voice (Drew)
+        
+        key = (voice_id, hashlib.blake2b(text.encode(), digest_size=16).digest())
+        cached = self._tts_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < TTS_CACHE_TTL:
+            self._tts_cache.move_to_end(key)
+            return cached[1]
+        
+        entry = self._tts_inflight.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(self._synthesize_speech(text, voice_id, key))
+            entry = [task, 0]
+            self._tts_inflight[key] = entry
+            task.add_done_callback(lambda done: self._tts_done(key, entry))
+        
+        entry[1] += 1
+        try:
+            # Shielded so one cancelled caller doesn't abort the call others wait on
+            return await asyncio.shield(entry[0])
+        except asyncio.CancelledError:
+            # The last waiter going away (e.g. a discarded speculative synthesis)
+            # cancels the ElevenLabs call itself so it isn't paid for
+            if entry[1] == 1:
+                self._forget_tts(key, entry)
+                entry[0].cancel()
+            raise
+        finally:
+            entry[1] -= 1
+    
+    def _forget_tts(self, key: tuple, entry: list):
+        """Stop handing out an in-flight entry; a newer call for the key may have replaced it"""
+        if self._tts_inflight.get(key) is entry:
+            del self._tts_inflight[key]
+    
+    def _tts_done(self, key: tuple, entry: list):
+        self._forget_tts(key, entry)
+        task = entry[0]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved even when every waiter was cancelled
+    
+    async def _synthesize_speech(self, text: str, voice_id: str, key: tuple) -> bytes:
+        """One ElevenLabs TTS call; the result is cached under key"""
         try:
-            if not voice_id:
-                voice_id = "29vD33N1CtxCmqQRPOHJ"  # Default male voice (Drew)
-            
             print(f"Generating speech with voice ID: {voice_id}")
             
             url = f"{self.elevenlabs_base_url}/text-to-speech/{voice_id}"
             
             headers = {
                 "Accept": "audio/mpeg",
-                "Content-Type": "application/json",
-                "xi-api-key": ELEVENLABS_API_KEY
-            }
-            
-            # Settings optimized for voice preservation and emotion
-            data = {
-                "text": text,
-                "model_id": "eleven_multilingual_v2",  # Better for emotion preservation
-                "voice_settings": {
-                    "stability": 0.4,  # Lower for more emotion variation
-                    "similarity_boost": 0.8,  # Higher to preserve voice characteristics
-                    "style": 0.3,  # Add some style variation
-                    "use_speaker_boost": True  # Preserve speaker characteristics
-                }
+                "Content-Type": "application/json"
             }
             
-            # Use requests in thread pool for speed
-            def sync_request():
-                return requests.post(url, json=data, headers=headers, timeout=15)
-            
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(executor, sync_request)
+            response = await app.state.http.post(url, json=self._tts_payload(text), headers=headers, timeout=15)
             
             if response.status_code == 200:
+                self._tts_cache[key] = (time.monotonic(), response.content)
+                self._tts_cache.move_to_end(key)
+                if len(self._tts_cache) > TTS_CACHE_SIZE:
+                    self._tts_cache.popitem(last=False)
                 return response.content
             else:
                 print(f"Speech generation error: {response.status_code} - {response.text}")
@@ -170,36 +262,59 @@ class OptimizedSpeechProcessor:
             print(f"Speech generation failed: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Speech generation failed: {str(e)}")
     
-    async def clone_voice(self, name: str, audio_file_path: str) -> str:
+    async def stream_speech(self, text: str, voice_id: str = None, chunk_size: int = 4096):
+        """Start a streaming TTS request and return an async iterator over MP3 chunks"""
+        if not voice_id:
+            voice_id = "29vD33N1CtxCmqQRPOHJ"  # Default male voice (Drew)
+        
+        print(f"Streaming speech with voice ID: {voice_id}")
+        
+        request = app.state.http.build_request(
+            "POST",
+            f"{self.elevenlabs_base_url}/text-to-speech/{voice_id}/stream",
+            params={"optimize_streaming_latency": 3},
+            json=self._tts_payload(text),
+            headers={"Accept": "audio/mpeg", "Content-Type": "application/json"}
+        )
+        response = await app.state.http.send(request, stream=True)
+        
+        # Fail before any audio is sent so the route can still return a JSON error
+        if response.status_code != 200:
+            detail = (await response.aread()).decode(errors="replace")
+            await response.aclose()
+            print(f"Speech streaming error: {response.status_code} - {detail}")
+            raise HTTPException(status_code=500, detail=f"Speech generation failed: {response.status_code} - {detail}")
+        
+        async def chunks():
+            try:
+                async for chunk in response.aiter_bytes(chunk_size):
+                    yield chunk
+            finally:
+                await response.aclose()
+        
+        return chunks()
+    
+    async def clone_voice(self, name: str, audio_bytes: bytes) -> str:
         """Clone voice using ElevenLabs Professional Voice Cloning"""
         try:
             url = f"{self.elevenlabs_base_url}/voices/add"
             
-            headers = {
-                "xi-api-key": ELEVENLABS_API_KEY
+            # Use professional cloning for better quality
+            files = {
+                "files": (UPLOAD_FILENAME, audio_bytes, "audio/mpeg")
+            }
+            data = {
+                "name": name,
+                "description": f"Professional clone for {name} - preserves emotions and speaking style",
+                "remove_background_noise": "true",  # Clean up audio
             }
             
-            # Use professional cloning for better quality
-            with open(audio_file_path, "rb") as audio_file:
-                files = {
-                    "files": (os.path.basename(audio_file_path), audio_file, "audio/mpeg")
-                }
-                data = {
-                    "name": name,
-                    "description": f"Professional clone for {name} - preserves emotions and speaking style",
-                    "remove_background_noise": "true",  # Clean up audio
-                }
-                
-                def sync_clone():
-                    return requests.post(url, headers=headers, files=files, data=data, timeout=60)
-                
-                # Run in thread pool to avoid blocking
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(executor, sync_clone)
+            response = await app.state.http.post(url, files=files, data=data, timeout=60)
             
             if response.status_code == 200:
                 result = response.json()
                 print(f"Voice cloned successfully: {result['voice_id']}")
+                self._voices_cache = (0.0, None)
                 return result["voice_id"]
             else:
                 print(f"Voice cloning failed: {response.status_code} - {response.text}")
@@ -209,17 +324,31 @@ class OptimizedSpeechProcessor:
             print(f"Voice cloning error: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Voice cloning failed: {str(e)}")
     
+    async def delete_voice(self, voice_id: str):
+        """Delete a cloned voice so it stops counting against the account's voice limit"""
+        response = await app.state.http.delete(f"{self.elevenlabs_base_url}/voices/{voice_id}")
+        if response.status_code != 200:
+            raise Exception(f"ElevenLabs delete error: {response.status_code} - {response.text}")
+        self._voices_cache = (0.0, None)
+    
     async def process_parallel(self, text: str, voice_id: str = None):
         """Process enhancement and speech generation in parallel"""
         try:
-            # Start both tasks simultaneously
+            # Start both tasks simultaneously: TTS speculatively speaks the original
+            # text, which is usable whenever enhancement leaves the words unchanged
             enhance_task = asyncio.create_task(self.enhance_text_fast(text))
+            tts_task = asyncio.create_task(self.generate_speech_fast(text, voice_id))
             
-            # Wait for enhancement to complete first
             enhanced_text = await enhance_task
             
-            # Generate speech with enhanced text
-            audio_data = await self.generate_speech_fast(enhanced_text, voice_id)
+            if spoken_words(enhanced_text) == spoken_words(text):
+                audio_data = await tts_task
+            else:
+                # Enhancement changed what is said; discard the speculative audio
+                tts_task.cancel()
+                if tts_task.done() and not tts_task.cancelled():
+                    tts_task.exception()
+                audio_data = await self.generate_speech_fast(enhanced_text, voice_id)
             
             return enhanced_text, audio_data
             
@@ -230,10 +359,88 @@ class OptimizedSpeechProcessor:
 
 speech_processor = OptimizedSpeechProcessor()
 
+@app.on_event("startup")
+async def open_http_client():
+    """Keep-alive HTTP/2 clients shared by all requests, one each for ElevenLabs and OpenAI"""
+    # asyncio.to_thread and run_in_executor(None, ...) share the tuned pool
+    asyncio.get_running_loop().set_default_executor(executor)
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=50, max_connections=200),
+        headers={"xi-api-key": ELEVENLABS_API_KEY}
+    )
+    # The SDK retries transient failures with exponential backoff
+    app.state.openai = AsyncOpenAI(
+        api_key=OPENAI_API_KEY,
+        max_retries=2,
+        timeout=httpx.Timeout(20.0, connect=3.0),
+        http_client=DefaultAsyncHttpxClient(http2=True)
+    )
+    # Pre-warm in the background; keep a reference so the task isn't collected
+    app.state.warmup = asyncio.create_task(speech_processor.warmup())
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    app.state.warmup.cancel()
+    await app.state.http.aclose()
+    await app.state.openai.close()
+
 @app.get("/")
 async def root():
     return {"message": "Ctrl+Z Speech Clarity API is running! ⚡"}
 
+async def timed(coro):
+    """Await coro and return (result, seconds taken)"""
+    start = time.time()
+    result = await coro
+    return result, time.time() - start
+
+# Clones orphaned by a failed transcription, finishing in the background
+discarded_clones = set()
+
+async def discard_clone(clone_task: asyncio.Task):
+    """Let an unneeded clone finish, then delete the voice it created"""
+    try:
+        voice_id, _ = await clone_task
+        await speech_processor.delete_voice(voice_id)
+        print(f"Deleted unused auto-cloned voice: {voice_id}")
+    except Exception as e:
+        print(f"Could not clean up auto-cloned voice: {str(e)}")
+
+async def transcribe_and_clone(audio_bytes: bytes, voice_id: str, auto_clone: bool):
+    """Transcribe the upload and, when no voice was given, clone it at the same time.
+    
+    Returns (original_text, voice_id, transcribe_time, clone_time). A failed clone
+    falls back to the default voice. If transcription fails, the clone is left to
+    finish in the background and its voice is deleted.
+    """
+    clone_task = None
+    if not voice_id and auto_clone:
+        print("Auto-cloning voice from user's speech...")
+        clone_task = asyncio.create_task(timed(speech_processor.clone_voice("AutoClone", audio_bytes)))
+    
+    try:
+        original_text, transcribe_time = await timed(speech_processor.transcribe_audio_fast(audio_bytes))
+    except BaseException:
+        if clone_task:
+            # Cancelling mid-upload could still leave a voice behind on ElevenLabs
+            cleanup = asyncio.create_task(discard_clone(clone_task))
+            discarded_clones.add(cleanup)
+            cleanup.add_done_callback(discarded_clones.discard)
+        raise
+    
+    clone_time = 0
+    if clone_task:
+        try:
+            voice_id, clone_time = await clone_task
+            print(f"Auto-cloned voice: {voice_id} in {clone_time:.2f}s")
+        except Exception as e:
+            print(f"Auto-cloning failed, using default voice: {str(e)}")
+            voice_id = None
+    
+    return original_text, voice_id, transcribe_time, clone_time
+
 @app.post("/api/create-voice-profile")
 async def create_voice_profile(name: str, audio: UploadFile = File(...)):
     """Create a voice profile using instant cloning"""
@@ -241,65 +448,43 @@ async def create_voice_profile(name: str, audio: UploadFile = File(...)):
     if not audio.content_type.startswith('audio/'):
         raise HTTPException(status_code=400, detail="File must be an audio file")
     
-    # Save uploaded audio
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-        content = await audio.read()
-        temp_file.write(content)
-        temp_audio_path = temp_file.name
+    content = await audio.read()
     
     try:
         # Clone voice using instant cloning
-        voice_id = await speech_processor.clone_voice(name, temp_audio_path)
+        voice_id = await speech_processor.clone_voice(name, content)
         
-        return JSONResponse({
+        return {
             "success": True,
             "voice_id": voice_id,
             "message": f"Voice profile '{name}' created instantly!"
-        })
+        }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Voice cloning failed: {str(e)}")
-    
-    finally:
-        # Clean up
-        try:
-            os.unlink(temp_audio_path)
-        except:
-            pass
 
 @app.post("/api/process-speech-fast")
-async def process_speech_fast(audio: UploadFile = File(...), voice_id: str = None, auto_clone: bool = True):
-    """Ultra-fast speech processing with automatic voice cloning"""
+async def process_speech_fast(request: Request, audio: UploadFile = File(...), voice_id: str = None, auto_clone: bool = True):
+    """Ultra-fast speech processing with automatic voice cloning.
+    
+    Clients sending `Accept: audio/mpeg` get the MP3 as the raw response body with
+    the texts and timings in headers; others get JSON with base64 audio.
+    """
     
     if not audio.content_type.startswith('audio/'):
         raise HTTPException(status_code=400, detail="File must be an audio file")
     
     start_time = time.time()
     
-    # Save uploaded audio to memory-based temp file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-        content = await audio.read()
-        temp_file.write(content)
-        temp_audio_path = temp_file.name
+    # Uploaded audio is kept in memory and handed to Whisper and ElevenLabs as bytes
+    content = await audio.read()
     
     try:
-        # Step 1: Fast transcription
-        transcribe_start = time.time()
-        original_text = await speech_processor.transcribe_audio_fast(temp_audio_path)
-        transcribe_time = time.time() - transcribe_start
-        
-        # Step 2: Auto voice cloning if no voice_id provided
-        clone_time = 0
-        if not voice_id and auto_clone:
-            try:
-                clone_start = time.time()
-                print("Auto-cloning voice from user's speech...")
-                voice_id = await speech_processor.clone_voice("AutoClone", temp_audio_path)
-                clone_time = time.time() - clone_start
-                print(f"Auto-cloned voice: {voice_id} in {clone_time:.2f}s")
-            except Exception as e:
-                print(f"Auto-cloning failed, using default voice: {str(e)}")
-                voice_id = None
+        # Steps 1-2: Fast transcription, with auto voice cloning running alongside
+        # when no voice_id was provided
+        original_text, voice_id, transcribe_time, clone_time = await transcribe_and_clone(
+            content, voice_id, auto_clone
+        )
         
         # Step 3: Parallel enhancement and speech generation
         process_start = time.time()
@@ -308,11 +493,25 @@ async def process_speech_fast(audio: UploadFile = File(...), voice_id: str = Non
         
         total_time = time.time() - start_time
         
-        return JSONResponse({
+        if "audio/mpeg" in request.headers.get("accept", ""):
+            return Response(content=audio_data, media_type="audio/mpeg", headers={
+                "X-Voice-Used": voice_id or "default",
+                "X-Auto-Cloned": str(voice_id is not None and auto_clone).lower(),
+                "X-Original-Text": quote(original_text),
+                "X-Enhanced-Text": quote(enhanced_text),
+                "Server-Timing": (
+                    f"transcription;dur={transcribe_time * 1000:.0f}, "
+                    f"voice_cloning;dur={clone_time * 1000:.0f}, "
+                    f"processing;dur={process_time * 1000:.0f}, "
+                    f"total;dur={total_time * 1000:.0f}"
+                )
+            })
+        
+        return {
             "success": True,
             "original_text": original_text,
             "enhanced_text": enhanced_text,
-            "audio_base64": audio_data.hex(),
+            "audio_base64": base64.b64encode(audio_data).decode('ascii'),
             "timing": {
                 "transcription": round(transcribe_time, 2),
                 "voice_cloning": round(clone_time, 2),
@@ -322,56 +521,87 @@ async def process_speech_fast(audio: UploadFile = File(...), voice_id: str = Non
             "voice_used": voice_id or "default",
             "auto_cloned": voice_id is not None and auto_clone,
             "speed_optimized": True
-        })
+        }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/process-speech-stream")
+async def process_speech_stream(audio: UploadFile = File(...), voice_id: str = None, auto_clone: bool = True):
+    """Same pipeline as /api/process-speech-fast, but the MP3 is streamed back as ElevenLabs synthesizes it"""
     
-    finally:
-        # Clean up
-        try:
-            os.unlink(temp_audio_path)
-        except:
-            pass
+    if not audio.content_type.startswith('audio/'):
+        raise HTTPException(status_code=400, detail="File must be an audio file")
+    
+    start_time = time.time()
+    
+    content = await audio.read()
+    
+    try:
+        original_text, voice_id, transcribe_time, clone_time = await transcribe_and_clone(
+            content, voice_id, auto_clone
+        )
+        
+        process_start = time.time()
+        enhanced_text = await speech_processor.enhance_text_fast(original_text)
+        audio_chunks = await speech_processor.stream_speech(enhanced_text, voice_id)
+        process_time = time.time() - process_start
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    # Metadata travels in headers because the body is the audio itself
+    return StreamingResponse(audio_chunks, media_type="audio/mpeg", headers={
+        "X-Voice-Used": voice_id or "default",
+        "X-Original-Text": quote(original_text),
+        "X-Enhanced-Text": quote(enhanced_text),
+        "Server-Timing": (
+            f"transcription;dur={transcribe_time * 1000:.0f}, "
+            f"voice_cloning;dur={clone_time * 1000:.0f}, "
+            f"processing;dur={process_time * 1000:.0f}, "
+            f"total;dur={(time.time() - start_time) * 1000:.0f}"
+        )
+    })
 
 @app.get("/api/voices")
 async def get_voices():
     """Get available voices from ElevenLabs"""
+    fetched_at, voices = speech_processor._voices_cache
+    if voices is not None and time.monotonic() - fetched_at < VOICES_CACHE_TTL:
+        return {"success": True, "voices": voices}
+    
     try:
-        def sync_get():
-            return requests.get(
-                f"{speech_processor.elevenlabs_base_url}/voices",
-                headers={"xi-api-key": ELEVENLABS_API_KEY}
-            )
-
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(executor, sync_get)
+        response = await app.state.http.get(f"{speech_processor.elevenlabs_base_url}/voices")
 
         if response.status_code == 200:
             data = response.json()
-            return JSONResponse({
+            voices = [
+                {
+                    "voice_id": voice["voice_id"],
+                    "name": voice["name"],
+                    "category": voice.get("category", "cloned")
+                }
+                for voice in data["voices"]
+            ]
+            speech_processor._voices_cache = (time.monotonic(), voices)
+            return {
                 "success": True,
-                "voices": [
-                    {
-                        "voice_id": voice["voice_id"],
-                        "name": voice["name"],
-                        "category": voice.get("category", "cloned")
-                    }
-                    for voice in data["voices"]
-                ]
-            })
+                "voices": voices
+            }
         else:
-            return JSONResponse({
+            return {
                 "success": False,
                 "error": f"API error: {response.status_code}",
                 "voices": []
-            })
+            }
     except Exception as e:
-        return JSONResponse({
+        return {
             "success": False,
             "error": str(e),
             "voices": []
-        })
+        }
 
 @app.get("/api/speed-test")
 async def speed_test():
@@ -379,31 +609,29 @@ async def speed_test():
     start = time.time()
     
     # Test OpenAI
-    try:
-        openai_start = time.time()
-        openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": "Hi"}],
-            max_tokens=1
-        )
-        openai_time = time.time() - openai_start
-    except Exception as e:
-        openai_time = f"Error: {str(e)}"
+    async def ping_openai():
+        try:
+            openai_start = time.time()
+            await app.state.openai.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": "Hi"}],
+                max_tokens=1
+            )
+            return time.time() - openai_start
+        except Exception as e:
+            return f"Error: {str(e)}"
     
     # Test ElevenLabs
-    try:
-        el_start = time.time()
-        def sync_test():
-            return requests.get(
-                f"{speech_processor.elevenlabs_base_url}/voices",
-                headers={"xi-api-key": ELEVENLABS_API_KEY}
-            )
-
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(executor, sync_test)
-        el_time = time.time() - el_start
-    except Exception as e:
-        el_time = f"Error: {str(e)}"
+    async def ping_elevenlabs():
+        try:
+            el_start = time.time()
+            await app.state.http.get(f"{speech_processor.elevenlabs_base_url}/voices")
+            return time.time() - el_start
+        except Exception as e:
+            return f"Error: {str(e)}"
+    
+    # Probe both APIs at once; the test takes as long as the slower one
+    openai_time, el_time = await asyncio.gather(ping_openai(), ping_elevenlabs())
     
     total = time.time() - start
     
@@ -416,4 +644,6 @@ async def speed_test():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvloop event loop and httptools parser; for production launch the same way:
+    # uvicorn speech_clarity:app --loop uvloop --http httptools --workers N
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
\ No newline at end of file
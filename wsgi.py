@@ -0,0 +1,8 @@
+# Production entry point for app.py: gunicorn -c gunicorn_conf.py wsgi:app
+# Patch the standard library before app.py imports requests/openai so their
+# sockets cooperate with gevent workers
+from gevent import monkey
+
+monkey.patch_all()
+
+from app import app  # noqa: E402